@@ -4,85 +4,85 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 # Importações do Python
 import os
-from flasgger import Swagger
 from flask_wtf import CSRFProtect
 from flask_cors import CORS
 
 
 # Importações do projeto
 from app.config.config import GlobalConfig
+from app.config.swagger import LazySwagger, init_swagger
+from app.utils.upload import UploadRequest
+from app.utils.cache import ReadThroughCache, make_shared_backend, cached_get
+from app.utils.serialization import make_json_provider
+from app.utils.backends import make_storage_backend
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = GlobalConfig.SECRET_KEY
-app.config['SQLALCHEMY_DATABASE_URI'] = GlobalConfig.SQLALCHEMY_DATABASE_URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = GlobalConfig.SQLALCHEMY_TRACK_MODIFICATIONS
-
-swagger_template = {
-    "swagger": "2.0",
-    "info": {
-        "title": "Mini BoxDrop API",
-        "description": "Esta é a documentação da API da ferramenta Mini BoxDrop de gereciamento de produtos com arquivos usando Swagger e Flasgger.",
-        "termsOfService": "/tos",
-        "contact": {
-            "email": "juliocesar.fs96@gmail.com"
-        },
-        "version": "1.0.0"
-    },
-    "host": "127.0.0.1:5000",  # o host e a porta onde sua API está rodando
-    "basePath": "/",  # o caminho base para todas as rotas
-    "schemes": [
-        "http",
-        "https"
-    ],
-    "securityDefinitions": {
-        "Bearer": {
-            "type": "apiKey",
-            "name": "Authorization",
-            "in": "header",
-            "description": "Cabeçalho de autorização JWT usando o esquema Bearer. Exemplo: \"Authorization: Bearer {token}\""
-        }
-    },
-}
-
-swagger_config = {
-    "headers": [],
-    "specs": [
-        {
-            "endpoint": 'apispec_1',
-            "route": '/apispec_1.json',
-            "rule_filter": lambda rule: True,  # todos os endpoints
-            "model_filter": lambda tag: True,  # todos os modelos
-        }
-    ],
-    "static_url_path": "/flasgger_static",
-    "swagger_ui": True,
-    "specs_route": "/apidocs/"
-}
-
-
-
-db = SQLAlchemy(app)
-swagger = Swagger(app, template=swagger_template, config=swagger_config)
-csrf = CSRFProtect(app)
-CORS(app)
-
-# Cria a pasta UPLOAD_FOLDER se não existir
-UPLOAD_FOLDER = GlobalConfig.UPLOAD_FOLDER
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
-login_manager = LoginManager(app)
+# Extensões criadas sem app; são ligadas a ele em create_app (init_app)
+db = SQLAlchemy()
+csrf = CSRFProtect()
+login_manager = LoginManager()
 login_manager.login_view = 'auth.login'  # Define a view para redirecionar usuários não autenticados
 
+# Cache read-through de produtos e usuários por id (invalidado nas rotas de escrita)
+product_cache = ReadThroughCache('products')
+user_cache = ReadThroughCache('users')
+
 @login_manager.user_loader
 def load_user(user_id):
     from app.models.models import User
-    return User.query.get(user_id)
+    return cached_get(user_cache, User, user_id)
+
+
+def register_blueprints(app):
+    from app.routes import error, auth, home, product, upload  # Importa as rotas só aqui para evitar importações circulares
+
+    app.register_blueprint(auth.bp)
+    app.register_blueprint(home.bp)
+    app.register_blueprint(product.bp)
+    app.register_blueprint(upload.bp)
+    app.register_blueprint(error.bp)
+
+def create_app(config=None):
+    """Cria e configura o app Flask.
+
+    config pode ser uma classe/objeto de configuração ou um dict; os valores sobrescrevem
+    os de GlobalConfig. O Swagger segue SWAGGER_MODE ('eager', 'lazy' ou 'off').
+    """
+    app = Flask(__name__)
+    app.request_class = UploadRequest  # Uploads gravados em blocos direto no UPLOAD_FOLDER
+    app.config.from_object(GlobalConfig)
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+    app.json = make_json_provider(app)
+
+    # Cria a pasta UPLOAD_FOLDER se não existir (uploads em andamento ficam sempre nela)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    # Backend dos arquivos dos produtos (veja storage.get_storage)
+    app.extensions['storage'] = make_storage_backend(app.config)
+
+    db.init_app(app)
+    csrf.init_app(app)
+    CORS(app)
+    login_manager.init_app(app)
+
+    cache_backend = make_shared_backend(app.config['CACHE_BACKEND'], app.config['CACHE_REDIS_URL'])
+    product_cache.init_app(app, cache_backend)
+    user_cache.init_app(app, cache_backend)
+
+    from app.utils.reclaimer import reclaimer
+    reclaimer.init_app(app)
+
+    # Contadores de escrita das tabelas (marca d'água das listagens)
+    from app.utils.versions import init_versions
+    init_versions()
 
-from app.routes import error, auth, home, product  # Importa as rotas após a criação do app para evitar importações circulares
+    register_blueprints(app)
 
+    swagger_mode = app.config['SWAGGER_MODE']
+    if swagger_mode == 'eager':
+        init_swagger(app)
+    elif swagger_mode == 'lazy':
+        app.wsgi_app = LazySwagger(app, register_blueprints)
 
-app.register_blueprint(auth.bp)
-app.register_blueprint(home.bp)
-app.register_blueprint(product.bp)
-app.register_blueprint(error.bp)
\ No newline at end of file
+    return app
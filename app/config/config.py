@@ -9,6 +9,64 @@ class GlobalConfig:
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = os.getenv('SQLALCHEMY_TRACK_MODIFICATIONS')
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER')
+    # Tamanho máximo do corpo da requisição em bytes (padrão: 1 GB)
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 1024 * 1024 * 1024))
+    # Tempo de vida em segundos de uma sessão de upload sem atividade (padrão: 24 horas)
+    UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 24 * 60 * 60))
+    # Tempo máximo em segundos para gravar uma parte; depois disso a reserva do offset expira
+    # e outra requisição pode reenviar a parte (padrão: 1 hora)
+    UPLOAD_CHUNK_TIMEOUT = int(os.getenv('UPLOAD_CHUNK_TIMEOUT', 60 * 60))
+    # Tamanho padrão e máximo das páginas nas listagens
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 1000))
+    # Quantidade de linhas buscadas por lote nas exportações NDJSON
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    # Quantidade máxima de produtos por requisição em /product/add_batch/
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 1000))
+    # Fila de remoção de arquivos: intervalo do worker (s), tamanho do lote, tentativas e
+    # idade mínima (s) de um arquivo para ser considerado órfão pela reconciliação
+    RECLAIM_INTERVAL = int(os.getenv('RECLAIM_INTERVAL', 60))
+    RECLAIM_BATCH_SIZE = int(os.getenv('RECLAIM_BATCH_SIZE', 500))
+    RECLAIM_MAX_ATTEMPTS = int(os.getenv('RECLAIM_MAX_ATTEMPTS', 5))
+    RECLAIM_GRACE_SECONDS = int(os.getenv('RECLAIM_GRACE_SECONDS', 60 * 60))
+    # Cache de leitura de produtos e usuários: itens por processo, TTL (s) e backend
+    # compartilhado opcional ('' para nenhum, 'local' ou 'redis' com CACHE_REDIS_URL);
+    # com backend compartilhado, o cache por processo (CACHE_MAXSIZE) não é usado
+    CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', 10000))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', '')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Hash de senhas: método/parâmetros do Werkzeug, tamanho do salt, threads do pool e
+    # quantidade máxima de operações pendentes antes de responder 503
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 64))
+    # Documentação Swagger: 'eager' (carregada no boot), 'lazy' (no primeiro acesso a /apidocs/) ou 'off'
+    SWAGGER_MODE = os.getenv('SWAGGER_MODE', 'lazy')
+    # Especificação OpenAPI pré-gerada por build_apispec.py (vazio: gerada no primeiro acesso)
+    SWAGGER_SPEC_FILE = os.getenv('SWAGGER_SPEC_FILE', '')
+    # Limites de validação dos ZIPs enviados (bombas de descompressão): entradas, soma dos
+    # tamanhos descompactados (padrão: 10 GB) e taxa máxima descompactado/compactado
+    ZIP_MAX_ENTRIES = int(os.getenv('ZIP_MAX_ENTRIES', 100000))
+    ZIP_MAX_UNCOMPRESSED = int(os.getenv('ZIP_MAX_UNCOMPRESSED', 10 * 1024 * 1024 * 1024))
+    ZIP_MAX_RATIO = int(os.getenv('ZIP_MAX_RATIO', 100))
+    # Serialização JSON das respostas: 'auto' (orjson se instalado), 'orjson' ou 'stdlib'
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+    # Armazenamento dos arquivos dos produtos: 'local' (UPLOAD_FOLDER) ou 's3' (bucket S3 ou
+    # compatível; credenciais pela configuração padrão do boto3). Uploads em andamento
+    # continuam sendo gravados no UPLOAD_FOLDER antes de irem para o armazenamento
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local')
+    STORAGE_S3_BUCKET = os.getenv('STORAGE_S3_BUCKET', '')
+    STORAGE_S3_PREFIX = os.getenv('STORAGE_S3_PREFIX', '')
+    STORAGE_S3_ENDPOINT_URL = os.getenv('STORAGE_S3_ENDPOINT_URL', '')
+    STORAGE_S3_REGION = os.getenv('STORAGE_S3_REGION', '')
+    # Multipart upload: tamanho de cada parte (mínimo 5 MB) e partes enviadas em paralelo
+    STORAGE_S3_PART_SIZE = int(os.getenv('STORAGE_S3_PART_SIZE', 8 * 1024 * 1024))
+    STORAGE_S3_WORKERS = int(os.getenv('STORAGE_S3_WORKERS', 4))
+    # Busca textual: buscas com mais resultados que isto são ranqueadas só entre os mais
+    # recentes, limitando o custo do bm25 (0 ranqueia todos os resultados)
+    SEARCH_RANK_WINDOW = int(os.getenv('SEARCH_RANK_WINDOW', 2000))
 
 # Vars from .flaskenv
 class FlaskConfig:
@@ -0,0 +1,175 @@
+# Importações padrão do Python
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+# Importações do Flask e extensões
+from flask import Flask, Response, request
+
+
+swagger_template = {
+    "swagger": "2.0",
+    "info": {
+        "title": "Mini BoxDrop API",
+        "description": "Esta é a documentação da API da ferramenta Mini BoxDrop de gereciamento de produtos com arquivos usando Swagger e Flasgger.",
+        "termsOfService": "/tos",
+        "contact": {
+            "email": "juliocesar.fs96@gmail.com"
+        },
+        "version": "1.0.0"
+    },
+    "host": "127.0.0.1:5000",  # o host e a porta onde sua API está rodando
+    "basePath": "/",  # o caminho base para todas as rotas
+    "schemes": [
+        "http",
+        "https"
+    ],
+    "securityDefinitions": {
+        "Bearer": {
+            "type": "apiKey",
+            "name": "Authorization",
+            "in": "header",
+            "description": "Cabeçalho de autorização JWT usando o esquema Bearer. Exemplo: \"Authorization: Bearer {token}\""
+        }
+    },
+}
+
+swagger_config = {
+    "headers": [],
+    "specs": [
+        {
+            "endpoint": 'apispec_1',
+            "route": '/apispec_1.json',
+            "rule_filter": lambda rule: True,  # todos os endpoints
+            "model_filter": lambda tag: True,  # todos os modelos
+        }
+    ],
+    "static_url_path": "/flasgger_static",
+    "swagger_ui": True,
+    "specs_route": "/apidocs/"
+}
+
+# Caminhos atendidos pelo Flasgger (interface, especificação e arquivos estáticos)
+SWAGGER_PATHS = ('/apidocs', '/apispec_', '/flasgger_static')
+
+SPEC_ENDPOINT = 'apispec_1'
+
+
+def init_swagger(app):
+    """Registra o Flasgger no app. O import fica aqui para não pesar no boot quando o Swagger é lazy ou desligado.
+
+    A rota da especificação passa a ser servida por CachedSpec (app.extensions['apispec']).
+    """
+    from flasgger import Swagger
+
+    swagger = Swagger(app, template=swagger_template, config=swagger_config)
+    spec = CachedSpec(app, swagger)
+    app.extensions['apispec'] = spec
+    app.view_functions[f'flasgger.{SPEC_ENDPOINT}'] = spec.view
+    return swagger
+
+
+def route_fingerprint(app):
+    """Hash da tabela de rotas (regra, métodos, endpoint e docstring da view), sem interpretar o YAML."""
+    digest = hashlib.sha256()
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: (rule.rule, rule.endpoint)):
+        view = app.view_functions.get(rule.endpoint)
+        digest.update(f"{rule.rule}|{','.join(sorted(rule.methods))}|{rule.endpoint}|".encode())
+        digest.update((getattr(view, '__doc__', None) or '').encode())
+    return digest.hexdigest()
+
+
+class CachedSpec:
+    """Especificação OpenAPI gerada uma única vez e servida já serializada, com ETag forte e gzip.
+
+    A especificação vem do arquivo SWAGGER_SPEC_FILE (gerado por build_apispec.py) quando ele
+    corresponde à tabela de rotas atual; senão é gerada pelo Flasgger. Ela só é refeita
+    quando route_fingerprint muda.
+    """
+
+    def __init__(self, app, swagger):
+        self.app = app
+        self.swagger = swagger
+        self.fingerprint = None
+        self.body = None
+        self.gzipped = None
+        self.etag = None
+        self._lock = threading.Lock()
+
+    def generate(self):
+        """Gera a especificação com o Flasgger (parse dos docstrings) e marca a tabela de rotas usada."""
+        self.swagger.apispecs.pop(SPEC_ENDPOINT, None)
+        spec = dict(self.swagger.get_apispecs(SPEC_ENDPOINT))
+        spec['x-route-fingerprint'] = route_fingerprint(self.app)
+        return spec
+
+    def load_file(self, fingerprint):
+        path = self.app.config.get('SWAGGER_SPEC_FILE')
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            spec = json.load(f)
+        if spec.get('x-route-fingerprint') != fingerprint:
+            self.app.logger.warning('%s is out of date with the route table; regenerating the spec', path)
+            return None
+        return spec
+
+    def load(self):
+        fingerprint = route_fingerprint(self.app)
+        if fingerprint == self.fingerprint:
+            return
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            spec = self.load_file(fingerprint) or self.generate()
+            body = json.dumps(spec, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+            self.gzipped = gzip.compress(body, mtime=0)
+            self.etag = hashlib.sha256(body).hexdigest()
+            self.body = body
+            self.fingerprint = fingerprint
+
+    def view(self):
+        self.load()
+        if request.accept_encodings['gzip']:
+            response = Response(self.gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(f'{self.etag}-gzip')
+        else:
+            response = Response(self.body, mimetype='application/json')
+            response.set_etag(self.etag)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+
+class LazySwagger:
+    """Middleware WSGI que só carrega o Swagger no primeiro acesso a /apidocs/ (ou à especificação).
+
+    O app principal sobe sem o Flasgger. No primeiro acesso a um dos SWAGGER_PATHS é
+    montado um app de documentação com os mesmos blueprints e o Swagger registrado;
+    as demais requisições seguem direto para o app principal.
+    """
+
+    def __init__(self, app, register_blueprints):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.register_blueprints = register_blueprints
+        self._docs_app = None
+        self._lock = threading.Lock()
+
+    def docs_app(self):
+        with self._lock:
+            if self._docs_app is None:
+                docs_app = Flask(self.app.import_name)
+                docs_app.config.from_mapping(self.app.config)
+                self.register_blueprints(docs_app)
+                init_swagger(docs_app)
+                self._docs_app = docs_app
+            return self._docs_app
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(SWAGGER_PATHS):
+            return self.docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
@@ -2,8 +2,8 @@
 from flask_wtf import FlaskForm
 
 # Importações do WTForms
-from wtforms import StringField, PasswordField, SubmitField, TextAreaField, FileField, ValidationError, HiddenField
-from wtforms.validators import DataRequired, Email, EqualTo, Length
+from wtforms import StringField, PasswordField, SubmitField, TextAreaField, FileField, ValidationError, HiddenField, IntegerField
+from wtforms.validators import DataRequired, Email, EqualTo, Length, Optional, NumberRange
 
 # Importações do seu projeto
 from app.models.models import User
@@ -41,6 +41,12 @@ class ProductAddForm(FlaskForm):
     submit = SubmitField('Add')
 
 
+class ProductBatchForm(FlaskForm):
+    id_user = StringField('User ID', validators=[DataRequired(message='User ID is required')])
+    manifest = TextAreaField('Manifest (JSON)')
+    submit = SubmitField('Add')
+
+
 class ProductEditForm(FlaskForm):
     name = StringField('Name', validators=[DataRequired(message='Name is required')])
     description = TextAreaField('Description', validators=[DataRequired(message='Description is required')])
@@ -49,3 +55,10 @@ class ProductEditForm(FlaskForm):
 
     file_data = FileField('Upload new ZIP File?')
     submit = SubmitField('Save')
+
+
+class ProductUploadSessionForm(ProductAddForm):
+    # Mesmos campos do ProductAddForm; o arquivo é enviado depois, em partes
+    file_data = None
+    filename = StringField('File Name')
+    size = IntegerField('Total Size', validators=[Optional(), NumberRange(min=0)])
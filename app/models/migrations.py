@@ -0,0 +1,111 @@
+# Importações padrão do Python
+import datetime
+
+# Importações de extensões Flask
+from sqlalchemy import inspect, text
+
+# Importações do seu projeto
+from app import db
+from app.models.models import FileReclaim, SchemaMigration, TableVersion, UploadSession, ZipEntry
+from app.utils.search import create_search_index, replace_legacy_search_index
+
+# Migrações em ordem de versão: (versão, descrição, função que recebe a conexão)
+MIGRATIONS = []
+
+def migration(version, description):
+    """Registra uma função de migração com a versão e descrição informadas."""
+    def register(upgrade):
+        MIGRATIONS.append((version, description, upgrade))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return upgrade
+    return register
+
+
+@migration(1, 'Products indexes by owner, owner+created_at and updated_at')
+def product_owner_indexes(connection):
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_id_user ON products (id_user)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_id_user_created_at ON products (id_user, created_at)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_updated_at ON products (updated_at)'))
+
+@migration(2, 'Keyset listing indexes, blob reference index and upload_sessions table')
+def listing_indexes_and_upload_sessions(connection):
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_created_at_id ON products (created_at, id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_file_zip_path ON products (file_zip_path)'))
+    UploadSession.__table__.create(connection, checkfirst=True)
+
+@migration(3, 'Durable file reclamation queue (file_reclaims)')
+def file_reclaims_table(connection):
+    FileReclaim.__table__.create(connection, checkfirst=True)
+
+@migration(4, 'ZIP central-directory manifest (zip_entries)')
+def zip_entries_table(connection):
+    # Blobs já existentes são indexados no primeiro acesso a /product/id/<id>/files/
+    ZipEntry.__table__.create(connection, checkfirst=True)
+
+@migration(5, 'Full-text search over products (products_fts, SQLite FTS5) and sync triggers')
+def products_search_index(connection):
+    # FTS5 só existe no SQLite; nos outros bancos a busca fica indisponível (501)
+    if connection.dialect.name == 'sqlite':
+        create_search_index(connection)
+
+@migration(6, 'Listing indexes (column, id) and (id_user, column, id) for created_at, updated_at and name')
+def listing_filter_indexes(connection):
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_id_user_created_at_id ON products (id_user, created_at, id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_updated_at_id ON products (updated_at, id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_id_user_updated_at_id ON products (id_user, updated_at, id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_name_id ON products (name, id)'))
+    connection.execute(text('CREATE INDEX IF NOT EXISTS ix_products_id_user_name_id ON products (id_user, name, id)'))
+    # Os índices antigos são prefixos dos novos e deixam de ser necessários
+    connection.execute(text('DROP INDEX IF EXISTS ix_products_id_user'))
+    connection.execute(text('DROP INDEX IF EXISTS ix_products_id_user_created_at'))
+    connection.execute(text('DROP INDEX IF EXISTS ix_products_updated_at'))
+
+@migration(7, 'Write counters per table (table_versions) for the listing watermarks')
+def table_versions(connection):
+    TableVersion.__table__.create(connection, checkfirst=True)
+    connection.execute(text(
+        "INSERT INTO table_versions (name, version, updated_at) "
+        "SELECT 'products', 0, :now WHERE NOT EXISTS (SELECT 1 FROM table_versions WHERE name = 'products')"
+    ), {'now': datetime.datetime.now()})
+
+@migration(8, 'Full-text search keyed by product id (products_search_keys), stable across VACUUM')
+def products_search_keys(connection):
+    if connection.dialect.name == 'sqlite':
+        replace_legacy_search_index(connection)
+
+@migration(9, 'Upload chunk reservation (upload_sessions.writing_until)')
+def upload_session_writing_until(connection):
+    # Bancos criados pelo create_all já têm a coluna
+    if 'writing_until' not in {column['name'] for column in inspect(connection).get_columns('upload_sessions')}:
+        connection.execute(text('ALTER TABLE upload_sessions ADD COLUMN writing_until DATETIME'))
+
+
+def applied_versions():
+    """Retorna o conjunto de versões já aplicadas no banco."""
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    return {row.version for row in SchemaMigration.query.all()}
+
+def pending_migrations():
+    applied = applied_versions()
+    return [item for item in MIGRATIONS if item[0] not in applied]
+
+def migrate(target=None):
+    """Aplica as migrações pendentes (até a versão target, se informada) e retorna as versões aplicadas.
+
+    Cada migração roda na sua própria transação junto com o registro da versão,
+    então uma falha não deixa o banco marcado com uma migração pela metade.
+    """
+    done = []
+    for version, description, upgrade in pending_migrations():
+        if target is not None and version > target:
+            break
+        with db.engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(
+                SchemaMigration.__table__.insert().values(
+                    version=version, description=description, applied_at=datetime.datetime.now()
+                )
+            )
+        done.append(version)
+    return done
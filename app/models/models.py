@@ -3,14 +3,19 @@ import datetime
 import uuid
 
 # Importações de extensões Flask
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
 # Importações do seu projeto
 from app import db
+from app.utils.passwords import password_hasher
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    # Colunas que não vão para o cache (utils/cache.py), que pode ser um Redis compartilhado
+    cache_exclude = ('password_hash',)
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(64), nullable=False)
@@ -27,10 +32,13 @@ class User(UserMixin, db.Model):
         return f'<User {self.email}>'
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     # Optional: Add these if not using UserMixin
     @property
@@ -57,6 +65,17 @@ class User(UserMixin, db.Model):
 
 class Product(db.Model):
     __tablename__ = 'products'
+    # Os mesmos índices são criados em bancos existentes pelas migrações (app/models/migrations.py)
+    __table_args__ = (
+        # Listagens: um índice (coluna, id) e um (id_user, coluna, id) por coluna de ordenação
+        db.Index('ix_products_created_at_id', 'created_at', 'id'),
+        db.Index('ix_products_id_user_created_at_id', 'id_user', 'created_at', 'id'),
+        db.Index('ix_products_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_products_id_user_updated_at_id', 'id_user', 'updated_at', 'id'),
+        db.Index('ix_products_name_id', 'name', 'id'),
+        db.Index('ix_products_id_user_name_id', 'id_user', 'name', 'id'),
+        db.Index('ix_products_file_zip_path', 'file_zip_path'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(128), nullable=False)
@@ -70,3 +89,95 @@ class Product(db.Model):
     
     def __repr__(self):
         return f'<Product {self.name}>'
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = db.Column(db.String(128), nullable=False)
+    description = db.Column(db.String(512))
+    id_user = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    extention = db.Column(db.String(16), nullable=False, default='zip')
+    # Tamanho total declarado pelo cliente (opcional) e bytes já confirmados
+    size = db.Column(db.BigInteger)
+    upload_offset = db.Column(db.BigInteger, nullable=False, default=0)
+    # Reserva da parte em gravação: até quando a requisição que a reservou pode gravá-la
+    writing_until = db.Column(db.DateTime)
+
+    # Date and time the session was created and expires
+    created_at = db.Column(db.DateTime, default=datetime.datetime.now)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    @staticmethod
+    def staging_filename_for(id):
+        """Nome do arquivo parcial no UPLOAD_FOLDER para a sessão com o id informado."""
+        return f'.session-{id}.part'
+
+    @property
+    def staging_filename(self):
+        return UploadSession.staging_filename_for(self.id)
+
+    def __repr__(self):
+        return f'<UploadSession {self.id} {self.upload_offset}>'
+
+class FileReclaim(db.Model):
+    __tablename__ = 'file_reclaims'
+
+    # Fila durável de arquivos a remover do UPLOAD_FOLDER (consumida pelo FileReclaimer)
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(256), nullable=False, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(512))
+
+    # Date and time the file was queued
+    created_at = db.Column(db.DateTime, default=datetime.datetime.now)
+
+    def __repr__(self):
+        return f'<FileReclaim {self.filename}>'
+
+class ZipEntry(db.Model):
+    __tablename__ = 'zip_entries'
+    # Manifesto (diretório central) de cada blob ZIP; guardado uma vez por blob, já que
+    # produtos com o mesmo conteúdo compartilham o arquivo (Product.file_zip_path)
+    __table_args__ = (
+        db.Index('ix_zip_entries_blob_position', 'blob', 'position'),
+        db.Index('ix_zip_entries_blob_name', 'blob', 'name'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    blob = db.Column(db.String(256), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Ordem no diretório central
+    name = db.Column(db.String(1024), nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=False)
+    compress_size = db.Column(db.BigInteger, nullable=False)
+    crc = db.Column(db.BigInteger, nullable=False)
+    compress_type = db.Column(db.Integer, nullable=False)
+    header_offset = db.Column(db.BigInteger, nullable=False)  # Offset do cabeçalho local no arquivo
+
+    def __repr__(self):
+        return f'<ZipEntry {self.blob} {self.name}>'
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    # Contador de escritas por tabela (veja utils/versions.py): marca d'água das listagens,
+    # lida pela chave primária em vez de um agregado sobre a tabela inteira
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # Date and time of the last write to the table
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.now)
+
+    def __repr__(self):
+        return f'<TableVersion {self.name} {self.version}>'
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    description = db.Column(db.String(256), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.datetime.now)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.version}>'
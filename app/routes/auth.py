@@ -1,19 +1,22 @@
 # Importações padrão do Flask
-from flask import Blueprint, flash, jsonify
+from flask import Blueprint, jsonify
 
 # Importações de segurança e autenticação
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user
+from sqlalchemy import delete as delete_rows, select, literal
+from sqlalchemy.exc import IntegrityError
 
 # Importações do seu projeto
-from app import db, csrf
-from app.models.models import User, Product
+from app import db, csrf, product_cache, user_cache
+from app.models.models import User, Product, UploadSession
 from app.forms.forms import LoginForm, RegistrationForm, SettingsForm
+from app.utils.reclaimer import reclaimer, enqueue_select
+from app.utils.pagination import page_args, keyset_page
+from app.utils.projection import field_args, projection, row_to_dict
+from app.utils.export import wants_ndjson, ndjson_response
+from app.utils.cache import cached_row, entity_from_cache
+from app.utils.conditional import row_etag, not_modified, with_validators
 import re
-import os
-
-# Importações do seu projeto
-from app import UPLOAD_FOLDER
 
 bp = Blueprint('user', __name__, url_prefix='/user')
 
@@ -28,14 +31,17 @@ def validate_form_user(form):
         return False
     return True
 
+# Colunas que a listagem pode devolver (parâmetro fields); password_hash nunca sai
+USER_FIELDS = ('id', 'name', 'last_name', 'email', 'created_at', 'updated_at')
+
 def user_to_dict(user):
     return {
         "id": user.id,
         "name": user.name,
         "last_name": user.last_name,
         "email": user.email,
-        'created_at': user.created_at.isoformat(),
-        'updated_at': user.updated_at.isoformat(),
+        'created_at': user.created_at,
+        'updated_at': user.updated_at,
     }
 
 # Swagger ADICIONADO
@@ -118,44 +124,59 @@ def register():
             }
             return jsonify(json_response), 400
 
-        # Verifica se o email já está cadastrado
-        user = User.query.filter_by(email=form.email.data).first()
-        if user:
-            json_response = {
-                "message": "User not created. Email already exists",
-                "status": 400
-            }
-            return jsonify(json_response), 400
         user = User(
             name=form.name.data,
             last_name=form.last_name.data,
-            email=form.email.data,
-            password_hash=generate_password_hash(form.password.data)
+            email=form.email.data
         )
+        user.set_password(form.password.data)
         db.session.add(user)
-        db.session.commit()
-
-        if db.session.query(User).filter_by(email=form.email.data).first():
-
-            json_response = {
-                "message": "User created",
-                "status": 200
-            }
-            return jsonify(json_response)
-        else:
+        # A constraint unique de users.email verifica se o email já está cadastrado
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
             json_response = {
-                "message": "User not created",
-                "status": 404
+                "message": "User not created. Email already exists",
+                "status": 400
             }
-            return jsonify(json_response), 404
+            return jsonify(json_response), 400
+
+        json_response = {
+            "message": "User created",
+            "status": 200
+        }
+        return jsonify(json_response)
         
 # Swagger ADICIONADO
 @bp.route('/list/')
 @csrf.exempt
 def list_users():
     """
-    Retorna a lista de usuários cadastrados no banco de dados
+    Retorna a lista de usuários cadastrados no banco de dados (paginada por cursor)
     ---
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Quantidade máxima de itens na página
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor opaco (next_cursor) retornado pela página anterior
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [json, ndjson]
+        description: Use ndjson para exportar todos os registros em streaming (application/x-ndjson), um por linha
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Colunas a retornar, separadas por vírgula (ex. id,name). Padrão - todas
     responses:
       200:
         description: Uma lista de usuários
@@ -239,12 +260,34 @@ def list_users():
 
     """
                  
-    users = User.query.all()
-    users_list = [user_to_dict(user) for user in users]
+    try:
+        fields = field_args(USER_FIELDS)
+    except ValueError:
+        json_response = {
+            "message": f"Invalid fields. Allowed fields: {', '.join(USER_FIELDS)}",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+    stmt = projection(User, fields)
+
+    if wants_ndjson():
+        return ndjson_response(stmt.order_by(User.created_at, User.id), lambda row: row_to_dict(fields, row))
+
+    limit, cursor = page_args()
+    try:
+        users, next_cursor = keyset_page(stmt, User, cursor, limit)
+    except ValueError:
+        json_response = {
+            "message": "Invalid cursor",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+    users_list = [row_to_dict(fields, row) for row in users]
 
     if len(users_list) == 0:
         json_response = {
             "data": users_list,
+            "next_cursor": next_cursor,
             "status": 200,
             "message": "Table users is empty"
         }
@@ -252,6 +295,7 @@ def list_users():
     if users_list:
         json_response = {
             "data": users_list,
+            "next_cursor": next_cursor,
             "status": 201,
             "message": "Users found"
         }
@@ -312,30 +356,25 @@ def login():
     """
     form = LoginForm()
     user = User.query.filter_by(email=form.email.data).first()
-    if not user:
-        json_response = {
-            "message": "User not found. Email or password is incorrect",
-            "status": 404
-        }
-        return jsonify(json_response), 404
-    if user and not user.check_password(form.password.data):
+    # Uma única verificação da senha (KDF caro), executada no pool limitado de hash
+    if not user or not user.check_password(form.password.data or ''):
         json_response = {
             "message": "User not found. Email or password is incorrect",
             "status": 404
         }
         return jsonify(json_response), 404
-    
-    if user and check_password_hash(user.password_hash, form.password.data):
-        login_user(user, remember=True)
-        json_response = {
-            "user": user_to_dict(user),
-            "message": "User logged in",
-            "status": 200
-        }
-        return jsonify(json_response)
+
+    # Hashes gravados com parâmetros antigos são refeitos com a senha recém verificada
+    if user.password_needs_rehash():
+        user.set_password(form.password.data)
+        db.session.commit()
+        user_cache.invalidate(user.id)
+
+    login_user(user, remember=True)
     json_response = {
-        "message": "User not found",
-        "status": 404
+        "user": user_to_dict(user),
+        "message": "User logged in",
+        "status": 200
     }
     return jsonify(json_response)
 
@@ -475,28 +514,32 @@ def settings():
         }
         return jsonify(json_response), 402
     
-    # Verifica se o email já está cadastrado
-    user_email = User.query.filter_by(email=form.email.data).first()
-    if user_email and user_email.id != user.id:
-        json_response = {
-            "message": "User not edited. Email already exists",
-            "status": 403
-        }
-        return jsonify(json_response), 403
-    
     user.name = form.name.data
     user.last_name = form.last_name.data
     user.email = form.email.data
     if form.new_password.data:
         user.set_password(form.new_password.data)
-    db.session.commit()
-    # Get new user updated
-    user = User.query.filter_by(email=form.email.data).first()
+
+    # A constraint unique de users.email verifica se o email já está cadastrado
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        json_response = {
+            "message": "User not edited. Email already exists",
+            "status": 403
+        }
+        return jsonify(json_response), 403
+
+    # A resposta é montada com o objeto em memória (já com o updated_at do flush), antes
+    # do commit expirar os atributos, sem consultar o usuário de novo
     json_response = {
         "user": user_to_dict(user),
         "message": "User edited",
         "status": 200
     }
+    db.session.commit()
+    user_cache.invalidate(user.id)
     return jsonify(json_response)
 
 # Swagger ADICIONADO
@@ -512,7 +555,19 @@ def get_id(id):
         type: string
         required: true
         description: ID do usuário
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag já conhecido pelo cliente
+      - name: If-Modified-Since
+        in: header
+        type: string
+        required: false
+        description: Data da versão já conhecida pelo cliente
     responses:
+      304:
+        description: Usuário não modificado
       200:
         description: Usuário encontrado
         schema:
@@ -570,21 +625,28 @@ def get_id(id):
                         description: Código de status
                         example: 404
     """
-    user = User.query.filter_by(id=id).first()
+    data = cached_row(user_cache, User, id)
 
-    if not user:
+    if not data:
         json_response = {
             "message": "User not found",
             "status": 404
         }
         return jsonify(json_response), 404
-    
+
+    # Validadores derivados do updated_at; o 304 sai sem serializar nem instanciar o ORM
+    etag = row_etag(data['id'], data['updated_at'])
+    response = not_modified(etag, data['updated_at'])
+    if response:
+        return response
+
+    user = entity_from_cache(User, data)
     json_response = {
         "data": user_to_dict(user),
         "status": 200,
         "message": "User found"
     }
-    return jsonify(json_response)
+    return with_validators(jsonify(json_response), etag, data['updated_at'])
 
 # Swagger ADICIONADO
 @bp.route('/delete/<id>/', methods=['GET'])
@@ -627,39 +689,36 @@ def delete(id):
               description: Código de status
               example: 400
     """
-    user = User.query.filter_by(id=id).first()
+    # Arquivos dos produtos e sessões de upload do usuário vão para a fila durável de remoção
+    enqueue_select(select(Product.file_zip_path).where(Product.id_user == id).distinct())
+    enqueue_select(select(literal('.session-') + UploadSession.id + literal('.part')).where(UploadSession.id_user == id))
 
-    if not user:
+    # Exclusão em cascata baseada em conjunto: produtos, sessões de upload e usuário na mesma transação
+    # Os ids dos produtos vêm do próprio DELETE (RETURNING), para invalidar o cache após o commit
+    product_ids = db.session.scalars(
+        delete_rows(Product).where(Product.id_user == id).returning(Product.id),
+        execution_options={'synchronize_session': False},
+    ).all()
+    UploadSession.query.filter_by(id_user=id).delete(synchronize_session=False)
+    deleted = User.query.filter_by(id=id).delete(synchronize_session=False)
+
+    if not deleted:
+        db.session.rollback()
         json_response = {
             "message": "User not found",
             "status": 404
         }
         return jsonify(json_response), 404
 
-    db.session.delete(user)
     db.session.commit()
+    user_cache.invalidate(id)
+    product_cache.invalidate(*product_ids)
 
-    if not User.query.filter_by(id=id).first():
-        # Deletar todos os produtos do usuário que o id foi deletado
-        products = Product.query.filter_by(id_user=id).all()
-        for product in products:
-            if product.file_zip_path:
-                file_path = os.path.join(UPLOAD_FOLDER, product.file_zip_path)
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)  # Tenta remover o arquivo do sistema
-                    except Exception as e:
-                        flash(f'Error deleting the file: {str(e)}', 'error')  # Exibe uma mensagem em caso de erro na exclusão do arquivo
-            db.session.delete(product)
-            db.session.commit()
+    # Os blobs sem referência são removidos em segundo plano
+    reclaimer.wake()
 
-        json_response = {
-            "message": "User deleted",
-            "status": 200
-        }
-        return jsonify(json_response)
     json_response = {
-        "message": "User not deleted",
-        "status": 400
+        "message": "User deleted",
+        "status": 200
     }
-    return jsonify(json_response), 400
\ No newline at end of file
+    return jsonify(json_response)
@@ -9,4 +9,31 @@ def page_not_found(e):
         "message": "Page not found",
         "status": 404
     }
-    return jsonify(jsonify_response), 404
\ No newline at end of file
+    return jsonify(jsonify_response), 404
+
+# Error 413
+@bp.app_errorhandler(413)
+def request_entity_too_large(e):
+    jsonify_response = {
+        "message": "File too large",
+        "status": 413
+    }
+    return jsonify(jsonify_response), 413
+
+# Error 415
+@bp.app_errorhandler(415)
+def unsupported_media_type(e):
+    jsonify_response = {
+        "message": e.description or "Unsupported media type",
+        "status": 415
+    }
+    return jsonify(jsonify_response), 415
+
+# Error 503
+@bp.app_errorhandler(503)
+def service_unavailable(e):
+    jsonify_response = {
+        "message": e.description or "Service unavailable",
+        "status": 503
+    }
+    return jsonify(jsonify_response), 503
@@ -1,6 +1,9 @@
 # Importações necessárias do Flask
 from flask import Blueprint, jsonify
 
+# Importações do seu projeto
+from app import product_cache, user_cache
+
 bp = Blueprint('home', __name__)
 
 @bp.route('/')
@@ -18,4 +21,15 @@ def index():
             "status": 500
         }
         return jsonify(json_response)
-    
\ No newline at end of file
+
+@bp.route('/cache/stats/')
+def cache_stats():
+    json_response = {
+        "data": {
+            "products": product_cache.stats(),
+            "users": user_cache.stats(),
+        },
+        "message": "Cache stats",
+        "status": 200
+    }
+    return jsonify(json_response)
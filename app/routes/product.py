@@ -1,20 +1,44 @@
 # Importações padrão do Python
+import builtins
+import json
+import mimetypes
 import os
+import posixpath
+import zipfile
 
 # Importações do Flask e extensões
-from flask import Blueprint, request, flash, jsonify
+from flask import Blueprint, Response, request, flash, jsonify, send_file, current_app
+from werkzeug.datastructures import ContentRange
 from werkzeug.utils import secure_filename
+from sqlalchemy import select
 
 # Importações do seu projeto
-from app import db, UPLOAD_FOLDER, csrf
-from app.models.models import Product
-from app.forms.forms import ProductAddForm, ProductEditForm
-from app.utils.helpers import generate_unique_zip_filename
+from app import db, csrf, product_cache
+from app.models.models import Product, ZipEntry
+from app.forms.forms import ProductAddForm, ProductBatchForm, ProductEditForm
+from app.utils.storage import blob_etag, blob_filename, get_storage
+from app.utils.upload import NOT_A_ZIP
+from app.utils.reclaimer import reclaimer, enqueue
+from app.utils.pagination import page_args, keyset_order, keyset_page
+from app.utils.filters import apply_listing, listing_args
+from app.utils.projection import field_args, projection, row_to_dict
+from app.utils.search import match_query, search_available, search_products, search_result_to_dict
+from app.utils.zipindex import InvalidZip, entry_to_dict, ensure_indexed, index_upload
+from app.utils.zipstream import open_entry
+from app.utils.export import wants_ndjson, ndjson_response
+from app.utils.cache import cached_row, entity_from_cache
+from app.utils.conditional import row_etag, collection_etag, not_modified, with_validators
+from app.utils.versions import table_version
 from app.models.models import User
 
 
 bp = Blueprint('product', __name__, url_prefix='/product')
 
+# Colunas que as listagens podem devolver (parâmetro fields)
+PRODUCT_FIELDS = ('id', 'name', 'description', 'file_zip_path', 'id_user', 'created_at', 'updated_at')
+# Colunas de ordenação das listagens (parâmetro sort); cada uma tem os índices (coluna, id) e (id_user, coluna, id)
+PRODUCT_SORT_KEYS = ('created_at', 'updated_at', 'name')
+
 def product_to_dict(product):
     return {
         'id': product.id,
@@ -22,10 +46,52 @@ def product_to_dict(product):
         'description': product.description,
         'file_zip_path': product.file_zip_path,
         'id_user': product.id_user,
-        'created_at': product.created_at.isoformat(),
-        'updated_at': product.updated_at.isoformat(),
+        'created_at': product.created_at,
+        'updated_at': product.updated_at,
     }
 
+def invalid_fields():
+    json_response = {
+        "message": f"Invalid fields. Allowed fields: {', '.join(PRODUCT_FIELDS)}",
+        "status": 400
+    }
+    return jsonify(json_response), 400
+
+def invalid_filters(error):
+    json_response = {
+        "message": str(error),
+        "status": 400
+    }
+    return jsonify(json_response), 400
+
+def not_a_zip():
+    json_response = {
+        "message": "Product file is not a ZIP archive",
+        "status": 400
+    }
+    return jsonify(json_response), 400
+
+def requested_range(etag, length):
+    """Retorna (intervalo, resposta 416): o intervalo (start, stop) pedido em Range, respeitando If-Range,
+    ou None para o conteúdo inteiro."""
+    if not request.range or ('If-Range' in request.headers and request.if_range.etag != etag):
+        return None, None
+    byte_range = request.range.range_for_length(length)
+    if byte_range is None:
+        response = Response(status=416)
+        response.headers['Content-Range'] = f'bytes */{length}'
+        return None, response
+    return byte_range, None
+
+def set_content_range(response, byte_range, length):
+    """Ajusta status, Content-Range e Content-Length de uma resposta em streaming ao intervalo servido."""
+    if byte_range:
+        response.status_code = 206
+        response.content_range = ContentRange('bytes', byte_range[0], byte_range[1], length)
+        response.content_length = byte_range[1] - byte_range[0]
+    else:
+        response.content_length = length
+
 def validate_form_product(form):
     if form.name.data == '' or form.name.data is None:
         return False
@@ -37,6 +103,31 @@ def validate_form_product(form):
         return False
     return True
 
+def batch_items(form):
+    """Monta a lista (name, description, arquivo) do lote a partir do manifest ou dos campos repetidos.
+
+    Com manifest, cada item é {"name", "description", "file"}, onde "file" é o nome do campo do arquivo.
+    Sem manifest, os campos name, description e file_data repetidos são pareados pela posição.
+    Lança ValueError se o manifest for inválido.
+    """
+    if form.manifest.data:
+        entries = json.loads(form.manifest.data)
+        # builtins.list: o nome list é a rota de listagem neste módulo
+        if not isinstance(entries, builtins.list) or not all(isinstance(entry, dict) for entry in entries):
+            raise ValueError('Invalid manifest')
+        # Valores que não são texto invalidam só o item (400 no resultado dele)
+        text = lambda value: value if isinstance(value, str) else None
+        return [
+            (text(entry.get('name')), text(entry.get('description')), request.files.get(text(entry.get('file')) or ''))
+            for entry in entries
+        ]
+    names = request.form.getlist('name')
+    descriptions = request.form.getlist('description')
+    files = request.files.getlist('file_data')
+    count = max(len(names), len(descriptions), len(files))
+    pad = lambda values: values + [None] * (count - len(values))
+    return builtins.list(zip(pad(names), pad(descriptions), pad(files)))
+
 def validate_form_product_edit(form):
     if form.name.data == '' or form.name.data is None:
         return False
@@ -67,7 +158,19 @@ def get_id(id):
         type: string
         required: true
         description: ID do produto
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag já conhecido pelo cliente
+      - name: If-Modified-Since
+        in: header
+        type: string
+        required: false
+        description: Data da versão já conhecida pelo cliente
     responses:
+      304:
+        description: Produto não modificado
       200:
         description: Um produto
         schema:
@@ -113,14 +216,21 @@ def get_id(id):
               description: Mensagem de erro
               example: 'Product not found'
     """
-    product = Product.query.get(id)
-    if product:
+    data = cached_row(product_cache, Product, id)
+    if data:
+        # Validadores derivados do updated_at; o 304 sai sem serializar nem instanciar o ORM
+        etag = row_etag(data['id'], data['updated_at'])
+        response = not_modified(etag, data['updated_at'])
+        if response:
+            return response
+
+        product = entity_from_cache(Product, data)
         json_response = {
             "data": product_to_dict(product),
             "status": 200,
             "message": "Product found"
         }
-        return jsonify(json_response)
+        return with_validators(jsonify(json_response), etag, data['updated_at'])
     json_response = {
             "message": "Product not found",
             "status": 404
@@ -132,9 +242,83 @@ def get_id(id):
 @csrf.exempt
 def list():
     """
-    Retorna a lista de produtos
+    Retorna a lista de produtos (paginada por cursor)
     ---
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Quantidade máxima de itens na página
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor opaco (next_cursor) retornado pela página anterior
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [json, ndjson]
+        description: Use ndjson para exportar todos os registros em streaming (application/x-ndjson), um por linha
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Colunas a retornar, separadas por vírgula (ex. id,name). Padrão - todas
+      - name: id_user
+        in: query
+        type: string
+        required: false
+        description: ID do usuário dono dos produtos
+      - name: name
+        in: query
+        type: string
+        required: false
+        description: Prefixo do nome (diferencia maiúsculas e minúsculas)
+      - name: created_after
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Criados a partir desta data (ISO 8601, inclusive)
+      - name: created_before
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Criados antes desta data (ISO 8601, exclusive)
+      - name: updated_after
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Atualizados a partir desta data (ISO 8601, inclusive)
+      - name: updated_before
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Atualizados antes desta data (ISO 8601, exclusive)
+      - name: sort
+        in: query
+        type: string
+        required: false
+        enum: [created_at, -created_at, updated_at, -updated_at, name, -name]
+        description: Ordenação (- para decrescente). Os filtros podem ser combinados; sem sort, a ordenação segue o primeiro filtro usado (padrão created_at)
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag já conhecido pelo cliente
+      - name: If-Modified-Since
+        in: header
+        type: string
+        required: false
+        description: Data da versão já conhecida pelo cliente
     responses:
+      304:
+        description: Lista não modificada
       200:
         description: Uma lista de produtos
         schema:
@@ -173,24 +357,58 @@ def list():
                 description: Data de atualização do produto
                 example: '2023-01-01T12:00:00'
     """
-    products = Product.query.all()
-    products_list = [product_to_dict(product) for product in products]
+    try:
+        fields = field_args(PRODUCT_FIELDS)
+    except ValueError:
+        return invalid_fields()
+    try:
+        listing = listing_args(PRODUCT_SORT_KEYS, owner_param='id_user')
+    except ValueError as e:
+        return invalid_filters(e)
+    stmt = apply_listing(projection(Product, fields, listing.sort_key), Product, listing)
+
+    # Marca d'água da tabela (contador de escritas, lido pela chave primária): o 304 sai sem
+    # carregar nenhuma linha. Exclusões também incrementam o contador e o Last-Modified
+    etag = updated_at = None
+    watermark = table_version(Product.__tablename__)
+    if watermark:
+        etag = collection_etag(watermark.version, wants_ndjson(), request.query_string.decode())
+        updated_at = watermark.updated_at
+        response = not_modified(etag, updated_at)
+        if response:
+            return response
+
+    if wants_ndjson():
+        return with_validators(ndjson_response(stmt.order_by(*keyset_order(Product, listing.sort_key, listing.descending)), lambda row: row_to_dict(fields, row)), etag, updated_at)
+
+    limit, cursor = page_args()
+    try:
+        products, next_cursor = keyset_page(stmt, Product, cursor, limit, listing.sort_key, listing.descending)
+    except ValueError:
+        json_response = {
+            "message": "Invalid cursor",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+    products_list = [row_to_dict(fields, row) for row in products]
     
     if len(products_list) == 0:
         json_response = {
             "data": products_list,
+            "next_cursor": next_cursor,
             "status": 200,
             "message": "Table products is empty"
         }
-        return jsonify(json_response)
+        return with_validators(jsonify(json_response), etag, updated_at)
 
     if products_list:
         json_response = {
             "data": products_list,
+            "next_cursor": next_cursor,
             "status": 200,
             "message": "Products found"
         }
-        return jsonify(json_response)
+        return with_validators(jsonify(json_response), etag, updated_at)
     
     json_response = {
             "message": "Products not found",
@@ -211,6 +429,62 @@ def list_id_user(id):
         type: string
         required: true
         description: ID do usuário
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Quantidade máxima de itens na página
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor opaco (next_cursor) retornado pela página anterior
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [json, ndjson]
+        description: Use ndjson para exportar todos os registros em streaming (application/x-ndjson), um por linha
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Colunas a retornar, separadas por vírgula (ex. id,name). Padrão - todas
+      - name: name
+        in: query
+        type: string
+        required: false
+        description: Prefixo do nome (diferencia maiúsculas e minúsculas)
+      - name: created_after
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Criados a partir desta data (ISO 8601, inclusive)
+      - name: created_before
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Criados antes desta data (ISO 8601, exclusive)
+      - name: updated_after
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Atualizados a partir desta data (ISO 8601, inclusive)
+      - name: updated_before
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Atualizados antes desta data (ISO 8601, exclusive)
+      - name: sort
+        in: query
+        type: string
+        required: false
+        enum: [created_at, -created_at, updated_at, -updated_at, name, -name]
+        description: Ordenação (- para decrescente). Os filtros podem ser combinados; sem sort, a ordenação segue o primeiro filtro usado (padrão created_at)
 
     responses:
       200:
@@ -252,12 +526,34 @@ def list_id_user(id):
                 example: '2023-01-01T12:00:00'
     """
     # Lista todos os produtos de um usuário
-    products = Product.query.filter_by(id_user=id).all()
-    products_list = [product_to_dict(product) for product in products]
+    try:
+        fields = field_args(PRODUCT_FIELDS)
+    except ValueError:
+        return invalid_fields()
+    try:
+        listing = listing_args(PRODUCT_SORT_KEYS)
+    except ValueError as e:
+        return invalid_filters(e)
+    stmt = apply_listing(projection(Product, fields, listing.sort_key), Product, listing, owner=id)
+
+    if wants_ndjson():
+        return ndjson_response(stmt.order_by(*keyset_order(Product, listing.sort_key, listing.descending)), lambda row: row_to_dict(fields, row))
+
+    limit, cursor = page_args()
+    try:
+        products, next_cursor = keyset_page(stmt, Product, cursor, limit, listing.sort_key, listing.descending)
+    except ValueError:
+        json_response = {
+            "message": "Invalid cursor",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+    products_list = [row_to_dict(fields, row) for row in products]
     
     if len(products_list) == 0:
         json_response = {
             "data": products_list,
+            "next_cursor": next_cursor,
             "status": 200,
             "message": "Table products is empty"
         }
@@ -266,6 +562,7 @@ def list_id_user(id):
     if products_list:
         json_response = {
             "data": products_list,
+            "next_cursor": next_cursor,
             "status": 200,
             "message": "Products found"
         }
@@ -277,6 +574,102 @@ def list_id_user(id):
     }
     return jsonify(json_response), 404
 
+# Swagger adicionado
+@bp.route('/search/')
+@csrf.exempt
+def search():
+    """
+    Busca produtos pelo nome e pela descrição (busca textual ordenada por relevância)
+    ---
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Termos da busca; todos precisam aparecer e um termo terminado em * casa como prefixo (ex. caneca az*)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Quantidade máxima de itens na página
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor opaco (next_cursor) retornado pela página anterior
+    responses:
+      200:
+        description: Produtos encontrados, do mais relevante para o menos relevante. Com truncated=true a busca teve mais de SEARCH_RANK_WINDOW resultados e só os mais recentes foram ranqueados (os mais antigos não aparecem em nenhuma página)
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              id:
+                type: string
+                description: ID do produto
+                example: '123e4567-e89b-12d3-a456-426614174000'
+              name:
+                type: string
+                description: Nome do produto
+                example: 'Caneca Azul'
+              description:
+                type: string
+                description: Descrição do produto
+                example: 'Caneca de cerâmica azul.'
+              highlight:
+                type: object
+                description: Nome e trecho da descrição com os termos encontrados entre <mark> e </mark> (texto escapado para HTML)
+                properties:
+                  name:
+                    type: string
+                    example: '<mark>Caneca</mark> Azul'
+                  description:
+                    type: string
+                    example: '<mark>Caneca</mark> de cerâmica azul.'
+              score:
+                type: number
+                description: Relevância (bm25); maior é mais relevante
+                example: 3.27
+      400:
+        description: Busca sem termos ou cursor inválido
+      501:
+        description: Busca indisponível no banco de dados configurado
+    """
+    if not search_available():
+        json_response = {
+            "message": "Search is not available for this database",
+            "status": 501
+        }
+        return jsonify(json_response), 501
+
+    query = match_query(request.args.get('q'))
+    if query is None:
+        json_response = {
+            "message": "Search terms are required (q)",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    limit, cursor = page_args()
+    try:
+        results, next_cursor, truncated = search_products(query, cursor, limit, current_app.config['SEARCH_RANK_WINDOW'])
+    except ValueError:
+        json_response = {
+            "message": "Invalid cursor",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    json_response = {
+        "data": [search_result_to_dict(row) for row in results],
+        "next_cursor": next_cursor,
+        "truncated": truncated,
+        "status": 200,
+        "message": "Products found" if results else "No products match the search"
+    }
+    return jsonify(json_response)
+
 
 # Swagger adicionado
 @bp.route('/add/', methods=['POST'])
@@ -307,7 +700,7 @@ def add():
         in: formData
         type: file
         required: true
-        description: Arquivo zip do produto
+        description: Arquivo zip do produto (validado - assinatura, diretório central e limites de descompressão)
     responses:
       200:
         description: Produto adicionado com sucesso
@@ -330,11 +723,24 @@ def add():
             message:
               type: string
               description: Mensagem de erro
-              example: 'Product not added'
+              example: 'Product not added. Invalid ZIP file: Too many entries (200000, max 100000)'
             status:
               type: integer
               description: Código de status
               example: 400
+      415:
+        description: O arquivo enviado não começa com a assinatura de um ZIP (upload abortado no primeiro bloco)
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Invalid file. Only ZIP archives are accepted'
+            status:
+              type: integer
+              description: Código de status
+              example: 415
     """
     form = ProductAddForm()
     if not validate_form_product(form):
@@ -357,17 +763,33 @@ def add():
         # Trata o arquivo enviado
         f = request.files['file_data']
         # Pegar a exensão do arquivo original
+        if f and f.stream.invalid:
+            json_response = {
+                "message": NOT_A_ZIP,
+                "status": 415
+            }
+            return jsonify(json_response), 415
         
         if f:
-            filename = secure_filename(generate_unique_zip_filename())
-            extention = f.filename.split('.')[-1]
-            filename = f"{filename}.{extention}"
-            f.save(os.path.join(UPLOAD_FOLDER, filename))
+            # Nome do arquivo derivado do conteúdo: uploads idênticos compartilham o mesmo blob
+            filename = blob_filename(f.stream.checksum, 'zip')
+            # Valida o ZIP e grava o manifesto (diretório central) na mesma transação do produto
+            try:
+                index_upload(filename, f.stream)
+            except InvalidZip as e:
+                json_response = {
+                    "message": f"Product not added. Invalid ZIP file: {e}",
+                    "status": 400
+                }
+                return jsonify(json_response), 400
             
             # Salva o caminho no banco de dados
             product = Product(name=form.name.data, description=form.description.data, file_zip_path=filename, id_user = form.id_user.data)
             db.session.add(product)
             db.session.commit()
+
+            # O arquivo já foi gravado em blocos num temporário; só vai para o armazenamento após o commit
+            f.stream.commit(get_storage(), filename)
             
             flash('Product added successfully!')
             json_response = {
@@ -381,6 +803,163 @@ def add():
     }
     return jsonify(json_response), 400
 
+# Swagger adicionado
+@bp.route('/add_batch/', methods=['POST'])
+@csrf.exempt
+def add_batch():
+    """
+    Adiciona vários produtos de um mesmo usuário em uma única requisição e transação
+    ---
+    consumes:
+      - multipart/form-data
+    parameters:
+      - name: id_user
+        in: formData
+        type: string
+        required: true
+        description: ID do usuário dono de todos os produtos
+      - name: manifest
+        in: formData
+        type: string
+        required: false
+        description: 'JSON com a lista de produtos: [{"name": "...", "description": "...", "file": "campo_do_arquivo"}]. Sem manifest, use os campos name, description e file_data repetidos, na mesma ordem'
+      - name: name
+        in: formData
+        type: string
+        required: false
+        description: Nome do produto (repetido, um por produto)
+      - name: description
+        in: formData
+        type: string
+        required: false
+        description: Descrição do produto (repetido, um por produto)
+      - name: file_data
+        in: formData
+        type: file
+        required: false
+        description: Arquivo zip do produto (repetido, um por produto)
+    responses:
+      200:
+        description: Lote processado; o resultado de cada item vem em data
+        schema:
+          type: object
+          properties:
+            data:
+              type: array
+              items:
+                type: object
+                properties:
+                  index:
+                    type: integer
+                    description: Posição do item no lote
+                    example: 0
+                  id:
+                    type: string
+                    description: ID do produto criado
+                    example: '123e4567-e89b-12d3-a456-426614174000'
+                  message:
+                    type: string
+                    description: Resultado do item
+                    example: 'Product added successfully'
+                  status:
+                    type: integer
+                    description: Código de status do item
+                    example: 200
+            message:
+              type: string
+              description: Mensagem de sucesso
+              example: 'Batch processed'
+            status:
+              type: integer
+              description: Código de status
+              example: 200
+      400:
+        description: Falha ao processar o lote
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Products not added. Invalid user ID'
+            status:
+              type: integer
+              description: Código de status
+              example: 400
+    """
+    form = ProductBatchForm()
+    if form.id_user.data == '' or form.id_user.data is None:
+        json_response = {
+            "message": "Products not added. Invalid form data",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    # O dono é validado uma única vez para todo o lote
+    user = User.query.get(form.id_user.data)
+    if not user:
+        json_response = {
+            "message": "Products not added. Invalid user ID",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    try:
+        items = batch_items(form)
+    except ValueError:
+        json_response = {
+            "message": "Products not added. Invalid manifest",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    if not items or len(items) > current_app.config['BATCH_MAX_ITEMS']:
+        json_response = {
+            "message": f"Products not added. The batch must have between 1 and {current_app.config['BATCH_MAX_ITEMS']} items",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    results = []
+    added = []
+    for index, (name, description, f) in enumerate(items):
+        if not name or not description or not f or not f.filename:
+            results.append({"index": index, "message": "Product not added. Invalid form data", "status": 400})
+            continue
+        if f.stream.invalid:
+            results.append({"index": index, "message": f"Product not added. {NOT_A_ZIP}", "status": 400})
+            continue
+        filename = blob_filename(f.stream.checksum, 'zip')
+        try:
+            index_upload(filename, f.stream)
+        except InvalidZip as e:
+            results.append({"index": index, "message": f"Product not added. Invalid ZIP file: {e}", "status": 400})
+            continue
+        product = Product(name=name, description=description, file_zip_path=filename, id_user=user.id)
+        added.append((index, product, f.stream, filename))
+
+    # Todas as linhas entram numa única transação
+    db.session.add_all([product for _, product, _, _ in added])
+    db.session.flush()
+    ids = {index: product.id for index, product, _, _ in added}
+    db.session.commit()
+
+    # Os arquivos só vão para o armazenamento após o commit
+    # Itens do manifest podem apontar para o mesmo campo de arquivo: cada upload é gravado uma vez
+    storage = get_storage()
+    for index, _, upload, filename in added:
+        if not upload.committed:
+            upload.commit(storage, filename)
+        results.append({"index": index, "id": ids[index], "message": "Product added successfully", "status": 200})
+
+    results.sort(key=lambda result: result["index"])
+    json_response = {
+        "data": results,
+        "message": "Batch processed",
+        "status": 200
+    }
+    return jsonify(json_response)
+
 # Swagger adicionado
 @bp.route('/edit/<id>/', methods=['POST'])
 @csrf.exempt
@@ -415,7 +994,7 @@ def edit(id):
         in: formData
         type: file
         required: false
-        description: Arquivo zip do produto
+        description: Arquivo zip do produto (validado - assinatura, diretório central e limites de descompressão)
     responses:
       200:
         description: Produto atualizado com sucesso
@@ -456,6 +1035,19 @@ def edit(id):
               type: integer
               description: Código de status
               example: 404
+      415:
+        description: O arquivo enviado não começa com a assinatura de um ZIP (upload abortado no primeiro bloco)
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Invalid file. Only ZIP archives are accepted'
+            status:
+              type: integer
+              description: Código de status
+              example: 415
     """
      
     product = Product.query.get(id)
@@ -474,21 +1066,30 @@ def edit(id):
         }
         return jsonify(json_response), 400
     else: 
+        new_upload = None
+        old_filename = None
         if 'file_data' in request.files:
             f = request.files['file_data']
             if f and f.filename != '':  # Verifica se um arquivo novo foi realmente enviado
-                old_file_path = os.path.join(UPLOAD_FOLDER, product.file_zip_path) if product.file_zip_path else None
-                filename = secure_filename(generate_unique_zip_filename())  # Gera um nome de arquivo único
-                extention = f.filename.split('.')[-1]
-                filename = f"{filename}.{extention}"
+                if f.stream.invalid:
+                    json_response = {
+                        "message": NOT_A_ZIP,
+                        "status": 415
+                    }
+                    return jsonify(json_response), 415
+                new_upload = f.stream
+                old_filename = product.file_zip_path
+                filename = blob_filename(new_upload.checksum, 'zip')  # Nome derivado do conteúdo
+                try:
+                    index_upload(filename, new_upload)
+                except InvalidZip as e:
+                    json_response = {
+                        "message": f"Product not updated. Invalid ZIP file: {e}",
+                        "status": 400
+                    }
+                    return jsonify(json_response), 400
                 
-                print(f"UPLOAD_FOLDER: {UPLOAD_FOLDER} - new filename: {filename}")
-                
-                f.save(os.path.join(UPLOAD_FOLDER, filename))  # Salva o novo arquivo
-
-                # Se havia um arquivo antigo, remove-o
-                if old_file_path and os.path.exists(old_file_path):
-                    os.remove(old_file_path)
+                current_app.logger.debug('New file for product %s: %s', product.id, filename)
 
                 # Atualiza o caminho do arquivo no objeto produto
                 product.file_zip_path = filename
@@ -496,7 +1097,17 @@ def edit(id):
         # Atualiza os outros campos do produto
         product.name = form.name.data
         product.description = form.description.data
+        if new_upload is not None:
+            # O arquivo antigo vai para a fila de remoção (só é apagado se ficar sem referências)
+            enqueue([old_filename])
         db.session.commit()
+        product_cache.invalidate(id)
+
+        if new_upload is not None:
+            # Grava o novo arquivo no armazenamento só após o commit
+            new_upload.commit(get_storage(), product.file_zip_path)
+            reclaimer.wake()
+
         flash('Product updated successfully!', 'success')
         json_response = {
             "message": "Product updated successfully",
@@ -552,18 +1163,361 @@ def delete(id):
             "status": 404
         }
         return jsonify(json_response), 404
-    if product.file_zip_path:
-        file_path = os.path.join(UPLOAD_FOLDER, product.file_zip_path)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)  # Tenta remover o arquivo do sistema
-            except Exception as e:
-                flash(f'Error deleting the file: {str(e)}', 'error')  # Exibe uma mensagem em caso de erro na exclusão do arquivo
-
+    # O arquivo vai para a fila durável na mesma transação; o blob só é removido
+    # em segundo plano quando a última referência a ele deixa de existir
+    enqueue([product.file_zip_path])
     db.session.delete(product)
     db.session.commit()
+    product_cache.invalidate(id)
+    reclaimer.wake()
     json_response = {
         "message": "Product deleted successfully",
         "status": 200
     }
-    return jsonify(json_response)
\ No newline at end of file
+    return jsonify(json_response)
+
+# Swagger adicionado
+@bp.route('/download/<id>/', methods=['GET'])
+@csrf.exempt
+def download(id):
+    """
+    Faz o download do arquivo zip de um produto
+    ---
+    produces:
+      - application/zip
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+        description: ID do produto
+      - name: Range
+        in: header
+        type: string
+        required: false
+        description: Intervalo de bytes (ex. bytes=0-1023) para download parcial ou retomado
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag já conhecido pelo cliente
+      - name: If-Range
+        in: header
+        type: string
+        required: false
+        description: ETag que deve coincidir para que o Range seja respeitado
+    responses:
+      200:
+        description: Arquivo do produto
+        schema:
+          type: file
+      206:
+        description: Parte do arquivo do produto (Range)
+        schema:
+          type: file
+      304:
+        description: Arquivo não modificado (If-None-Match)
+      404:
+        description: Produto ou arquivo não encontrado
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Product not found'
+            status:
+              type: integer
+              description: Código de status
+              example: 404
+      416:
+        description: Intervalo solicitado inválido
+    """
+    product = Product.query.get(id)
+    if not product:
+        json_response = {
+            "message": "Product not found",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+
+    storage = get_storage()
+    info = storage.stat(product.file_zip_path)
+    if info is None:
+        json_response = {
+            "message": "File not found",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+
+    extention = product.file_zip_path.split('.')[-1]
+    download_name = f"{secure_filename(product.name) or product.id}.{extention}"
+    etag = blob_etag(product.file_zip_path)
+
+    file_path = storage.local_path(product.file_zip_path)
+    if file_path is not None:
+        # send_file usa wsgi.file_wrapper (sendfile) e trata Range, If-Range e If-None-Match;
+        # o arquivo nunca é lido inteiro para a memória
+        return send_file(
+            os.path.abspath(file_path),
+            as_attachment=True,
+            download_name=download_name,
+            conditional=True,
+            etag=etag or True,
+        )
+
+    # Object store: o blob é repassado em blocos e o Range vira um range-get no backend
+    etag = etag or f'{info.size:x}-{int(info.mtime):x}'
+    response = not_modified(etag, None)
+    if response:
+        return response
+    byte_range, response = requested_range(etag, info.size)
+    if response:
+        return response
+    try:
+        body = storage.get_stream(product.file_zip_path, *(byte_range or (0, info.size)))
+    except FileNotFoundError:
+        json_response = {
+            "message": "File not found",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+
+    response = Response(body, mimetype='application/zip', direct_passthrough=True)
+    set_content_range(response, byte_range, info.size)
+    response.accept_ranges = 'bytes'
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return with_validators(response, etag, None)
+
+# Swagger adicionado
+@bp.route('/id/<id>/files/', methods=['GET'])
+@csrf.exempt
+def list_files(id):
+    """
+    Lista os arquivos dentro do ZIP de um produto (manifesto indexado, sem abrir o arquivo)
+    ---
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+        description: ID do produto
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Quantidade máxima de entradas na página
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor (next_cursor) retornado pela página anterior
+    responses:
+      200:
+        description: Entradas do ZIP, na ordem do diretório central
+        schema:
+          type: object
+          properties:
+            data:
+              type: array
+              items:
+                type: object
+                properties:
+                  name:
+                    type: string
+                    description: Caminho da entrada dentro do ZIP
+                    example: 'assets/user.png'
+                  is_dir:
+                    type: boolean
+                    description: Se a entrada é um diretório
+                    example: false
+                  file_size:
+                    type: integer
+                    description: Tamanho descompactado em bytes
+                    example: 20181
+                  compress_size:
+                    type: integer
+                    description: Tamanho compactado em bytes
+                    example: 19811
+                  crc:
+                    type: string
+                    description: CRC-32 da entrada (hexadecimal)
+                    example: '1c291ca3'
+                  compress_type:
+                    type: integer
+                    description: Método de compressão (0 = stored, 8 = deflate)
+                    example: 8
+            next_cursor:
+              type: string
+              description: Cursor da próxima página (null na última)
+            message:
+              type: string
+              description: Mensagem de sucesso
+              example: 'Files found'
+            status:
+              type: integer
+              description: Código de status
+              example: 200
+      400:
+        description: Cursor inválido ou arquivo do produto não é um ZIP
+      404:
+        description: Produto não encontrado
+    """
+    data = cached_row(product_cache, Product, id)
+    if data is None:
+        json_response = {
+            "message": "Product not found",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+    blob = data['file_zip_path']
+
+    limit, cursor = page_args()
+    try:
+        after = int(cursor) if cursor else -1
+    except ValueError:
+        json_response = {
+            "message": "Invalid cursor",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    # O manifesto de um blob nunca muda (o nome é o hash do conteúdo)
+    etag = collection_etag(blob, limit, after)
+    response = not_modified(etag, None)
+    if response:
+        return response
+
+    stmt = (select(ZipEntry.position, ZipEntry.name, ZipEntry.file_size, ZipEntry.compress_size, ZipEntry.crc, ZipEntry.compress_type)
+            .where(ZipEntry.blob == blob, ZipEntry.position > after)
+            .order_by(ZipEntry.position)
+            .limit(limit + 1))
+    entries = db.session.execute(stmt).all()
+    if not entries and after < 0:
+        # Blob anterior ao índice: lê o diretório central uma vez e grava o manifesto
+        if not ensure_indexed(blob):
+            return not_a_zip()
+        entries = db.session.execute(stmt).all()
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = str(entries[-1].position)
+
+    json_response = {
+        "data": [entry_to_dict(entry) for entry in entries],
+        "next_cursor": next_cursor,
+        "message": "Files found",
+        "status": 200
+    }
+    return with_validators(jsonify(json_response), etag, None)
+
+# Swagger adicionado
+@bp.route('/id/<id>/files/<path:path>', methods=['GET'])
+@csrf.exempt
+def get_file(id, path):
+    """
+    Retorna um único arquivo de dentro do ZIP de um produto, em streaming
+    ---
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+        description: ID do produto
+      - name: path
+        in: path
+        type: string
+        required: true
+        description: Caminho da entrada dentro do ZIP (ex. assets/user.png)
+      - name: Range
+        in: header
+        type: string
+        required: false
+        description: Intervalo de bytes (somente para entradas sem compressão)
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag já conhecido pelo cliente
+    responses:
+      200:
+        description: Conteúdo da entrada
+        schema:
+          type: file
+      206:
+        description: Parte da entrada (Range)
+        schema:
+          type: file
+      304:
+        description: Entrada não modificada (If-None-Match)
+      400:
+        description: Arquivo do produto não é um ZIP ou entrada criptografada
+      404:
+        description: Produto ou entrada não encontrados
+      416:
+        description: Intervalo solicitado inválido
+    """
+    data = cached_row(product_cache, Product, id)
+    if data is None:
+        json_response = {
+            "message": "Product not found",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+    blob = data['file_zip_path']
+
+    stmt = (select(ZipEntry.position, ZipEntry.name, ZipEntry.file_size, ZipEntry.compress_size, ZipEntry.crc, ZipEntry.compress_type, ZipEntry.header_offset)
+            .where(ZipEntry.blob == blob, ZipEntry.name == path))
+    entry = db.session.execute(stmt).first()
+    if entry is None:
+        if not ensure_indexed(blob):
+            return not_a_zip()
+        entry = db.session.execute(stmt).first()
+    if entry is None or entry.name.endswith('/'):
+        json_response = {
+            "message": "File not found in the product archive",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+
+    # O conteúdo de uma entrada nunca muda (o nome do blob é o hash do conteúdo)
+    etag = row_etag(blob, entry.position)
+    response = not_modified(etag, None)
+    if response:
+        return response
+
+    # Range só em entradas sem compressão, em que o trecho pedido é lido direto do arquivo
+    byte_range = None
+    stored = entry.compress_type == zipfile.ZIP_STORED
+    if stored:
+        byte_range, response = requested_range(etag, entry.file_size)
+        if response:
+            return response
+
+    try:
+        body = open_entry(get_storage(), blob, entry, byte_range)
+    except NotImplementedError:
+        json_response = {
+            "message": "Encrypted entries are not supported",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+    except (OSError, zipfile.BadZipFile):
+        json_response = {
+            "message": "File not found",
+            "status": 404
+        }
+        return jsonify(json_response), 404
+
+    mimetype = mimetypes.guess_type(entry.name)[0] or 'application/octet-stream'
+    response = Response(body, mimetype=mimetype, direct_passthrough=True)
+    set_content_range(response, byte_range, entry.file_size)
+    if stored:
+        response.accept_ranges = 'bytes'
+    # O conteúdo do ZIP vem do usuário (HTML, SVG...): sempre como anexo, sem sniffing e, se
+    # mesmo assim for renderizado, numa origem isolada, sem scripts nem acesso à API
+    response.headers.set('Content-Disposition', 'attachment', filename=posixpath.basename(entry.name))
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['Content-Security-Policy'] = 'sandbox'
+    return with_validators(response, etag, None)
@@ -0,0 +1,480 @@
+# Importações padrão do Python
+import datetime
+import os
+
+# Importações do Flask e extensões
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import or_, update
+
+# Importações do seu projeto
+from app import db, csrf
+from app.models.models import Product, UploadSession, User
+from app.forms.forms import ProductUploadSessionForm
+from app.utils.storage import blob_filename, get_storage, upload_path
+from app.utils.upload import file_checksum, write_chunk
+from app.utils.zipindex import InvalidZip, index_path
+
+
+bp = Blueprint('upload', __name__, url_prefix='/product/upload')
+
+def session_to_dict(upload_session):
+    return {
+        'id': upload_session.id,
+        'name': upload_session.name,
+        'description': upload_session.description,
+        'id_user': upload_session.id_user,
+        'size': upload_session.size,
+        'offset': upload_session.upload_offset,
+        'created_at': upload_session.created_at,
+        'updated_at': upload_session.updated_at,
+        'expires_at': upload_session.expires_at,
+    }
+
+def validate_form_upload_session(form):
+    if form.name.data == '' or form.name.data is None:
+        return False
+    if form.description.data == '' or form.description.data is None:
+        return False
+    if form.id_user.data == '' or form.id_user.data is None:
+        return False
+    if form.size.data is not None and form.size.data < 0:
+        return False
+    return True
+
+def session_expiration():
+    return datetime.datetime.now() + datetime.timedelta(seconds=current_app.config['UPLOAD_SESSION_TTL'])
+
+def remove_staging_file(upload_session):
+    staging_path = upload_path(upload_session.staging_filename)
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+
+def purge_expired_sessions():
+    """Remove as sessões de upload expiradas e seus arquivos parciais. Retorna quantas foram removidas."""
+    expired = UploadSession.query.filter(UploadSession.expires_at < datetime.datetime.now()).all()
+    for upload_session in expired:
+        remove_staging_file(upload_session)
+        db.session.delete(upload_session)
+    db.session.commit()
+    return len(expired)
+
+def get_active_session(id):
+    upload_session = UploadSession.query.get(id)
+    if upload_session and upload_session.expires_at < datetime.datetime.now():
+        remove_staging_file(upload_session)
+        db.session.delete(upload_session)
+        db.session.commit()
+        return None
+    return upload_session
+
+def claim_session(id, offset):
+    """Reserva a sessão para gravar a partir de offset (UPDATE condicional no offset confirmado).
+
+    Só uma requisição por vez obtém a reserva, que expira após UPLOAD_CHUNK_TIMEOUT. Retorna
+    o prazo da reserva, que identifica quem a detém, ou None se o offset mudou ou se outra
+    requisição está gravando.
+    """
+    now = datetime.datetime.now()
+    lease = now + datetime.timedelta(seconds=current_app.config['UPLOAD_CHUNK_TIMEOUT'])
+    claimed = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == id, UploadSession.upload_offset == offset,
+               or_(UploadSession.writing_until.is_(None), UploadSession.writing_until < now))
+        .values(writing_until=lease),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    db.session.commit()
+    return lease if claimed else None
+
+def release_session(id, lease, **values):
+    """Libera a reserva lease da sessão gravando values; retorna False se ela já expirou e foi tomada."""
+    released = db.session.execute(
+        update(UploadSession)
+        .where(UploadSession.id == id, UploadSession.writing_until == lease)
+        .values(writing_until=None, **values),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    db.session.commit()
+    return bool(released)
+
+def offset_conflict(id, message="Offset mismatch"):
+    # Relê a sessão: o offset confirmado pode ter mudado (ou a sessão pode ter sido finalizada)
+    upload_session = db.session.get(UploadSession, id, populate_existing=True)
+    if not upload_session:
+        return session_not_found()
+    json_response = {
+        "message": message,
+        "offset": upload_session.upload_offset,
+        "status": 409
+    }
+    return jsonify(json_response), 409
+
+def session_not_found():
+    json_response = {
+        "message": "Upload session not found",
+        "status": 404
+    }
+    return jsonify(json_response), 404
+
+# Swagger adicionado
+@bp.route('/', methods=['POST'])
+@csrf.exempt
+def create():
+    """
+    Cria uma sessão de upload retomável para um novo produto
+    ---
+    consumes:
+      - multipart/form-data
+    parameters:
+      - name: name
+        in: formData
+        type: string
+        required: true
+        description: Nome do produto
+      - name: description
+        in: formData
+        type: string
+        required: true
+        description: Descrição do produto
+      - name: id_user
+        in: formData
+        type: string
+        required: true
+        description: ID do usuário que adicionou o produto
+      - name: filename
+        in: formData
+        type: string
+        required: false
+        description: Nome original do arquivo (informativo; o arquivo precisa ser um ZIP)
+      - name: size
+        in: formData
+        type: integer
+        required: false
+        description: Tamanho total do arquivo em bytes
+    responses:
+      200:
+        description: Sessão criada
+        schema:
+          type: object
+          properties:
+            data:
+              type: object
+              properties:
+                id:
+                  type: string
+                  description: ID da sessão de upload
+                  example: '123e4567-e89b-12d3-a456-426614174000'
+                offset:
+                  type: integer
+                  description: Bytes já confirmados
+                  example: 0
+                expires_at:
+                  type: string
+                  format: date-time
+                  description: Data de expiração da sessão
+                  example: '2023-01-02T12:00:00'
+            message:
+              type: string
+              description: Mensagem de sucesso
+              example: 'Upload session created'
+            status:
+              type: integer
+              description: Código de status
+              example: 200
+      400:
+        description: Falha ao criar a sessão
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Upload session not created. Invalid form data'
+            status:
+              type: integer
+              description: Código de status
+              example: 400
+    """
+    # Aproveita a criação de sessões para recolher as que expiraram
+    purge_expired_sessions()
+
+    form = ProductUploadSessionForm()
+    if not validate_form_upload_session(form):
+        json_response = {
+            "message": "Upload session not created. Invalid form data",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    user = User.query.get(form.id_user.data)
+    if not user:
+        json_response = {
+            "message": "Upload session not created. Invalid user ID",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    if form.size.data is not None and form.size.data > current_app.config['MAX_CONTENT_LENGTH']:
+        json_response = {
+            "message": "File too large",
+            "status": 413
+        }
+        return jsonify(json_response), 413
+
+    upload_session = UploadSession(
+        name=form.name.data,
+        description=form.description.data,
+        id_user=form.id_user.data,
+        extention='zip',  # Somente ZIPs são aceitos; o nome original não define a extensão
+        size=form.size.data,
+        expires_at=session_expiration()
+    )
+    db.session.add(upload_session)
+    db.session.commit()
+    open(upload_path(upload_session.staging_filename), 'wb').close()
+
+    json_response = {
+        "data": session_to_dict(upload_session),
+        "message": "Upload session created",
+        "status": 200
+    }
+    return jsonify(json_response)
+
+# Swagger adicionado
+@bp.route('/<id>/', methods=['GET'])
+@csrf.exempt
+def status(id):
+    """
+    Retorna o offset já confirmado de uma sessão de upload
+    ---
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+        description: ID da sessão de upload
+    responses:
+      200:
+        description: Sessão encontrada
+        headers:
+          Upload-Offset:
+            type: integer
+            description: Bytes já confirmados
+      404:
+        description: Sessão não encontrada ou expirada
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Upload session not found'
+            status:
+              type: integer
+              description: Código de status
+              example: 404
+    """
+    upload_session = get_active_session(id)
+    if not upload_session:
+        return session_not_found()
+
+    json_response = {
+        "data": session_to_dict(upload_session),
+        "message": "Upload session found",
+        "status": 200
+    }
+    response = jsonify(json_response)
+    response.headers['Upload-Offset'] = str(upload_session.upload_offset)
+    return response
+
+# Swagger adicionado
+@bp.route('/<id>/', methods=['PUT', 'PATCH'])
+@csrf.exempt
+def append(id):
+    """
+    Envia uma parte do arquivo a partir de um offset
+    ---
+    consumes:
+      - application/octet-stream
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+        description: ID da sessão de upload
+      - name: Upload-Offset
+        in: header
+        type: integer
+        required: true
+        description: Offset em que a parte começa; deve ser igual ao offset confirmado
+      - name: body
+        in: body
+        required: true
+        description: Bytes da parte
+        schema:
+          type: string
+          format: binary
+    responses:
+      200:
+        description: Parte gravada
+        headers:
+          Upload-Offset:
+            type: integer
+            description: Novo offset confirmado
+      404:
+        description: Sessão não encontrada ou expirada
+      409:
+        description: Offset diferente do confirmado ou outra parte sendo gravada na sessão
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Offset mismatch'
+            offset:
+              type: integer
+              description: Offset confirmado
+              example: 1048576
+            status:
+              type: integer
+              description: Código de status
+              example: 409
+      413:
+        description: Parte ultrapassa o tamanho total permitido
+    """
+    upload_session = get_active_session(id)
+    if not upload_session:
+        return session_not_found()
+
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        offset = request.args.get('offset', type=int)
+    if offset is None or offset != upload_session.upload_offset:
+        return offset_conflict(id)
+
+    # Duas requisições com o mesmo offset não podem gravar juntas: só a que reservar grava
+    lease = claim_session(id, offset)
+    if lease is None:
+        return offset_conflict(id, "Offset mismatch. Another chunk is being written")
+
+    max_size = upload_session.size if upload_session.size is not None else current_app.config['MAX_CONTENT_LENGTH']
+    staging_path = upload_path(upload_session.staging_filename)
+    try:
+        new_offset = write_chunk(staging_path, offset, request.stream, max_size)
+    except Exception:
+        release_session(id, lease)
+        raise
+    if not release_session(id, lease, upload_offset=new_offset, expires_at=session_expiration()):
+        return offset_conflict(id, "Offset mismatch. Chunk reservation expired")
+    db.session.refresh(upload_session)
+
+    json_response = {
+        "data": session_to_dict(upload_session),
+        "message": "Chunk received",
+        "status": 200
+    }
+    response = jsonify(json_response)
+    response.headers['Upload-Offset'] = str(upload_session.upload_offset)
+    return response
+
+# Swagger adicionado
+@bp.route('/<id>/finalize/', methods=['POST'])
+@csrf.exempt
+def finalize(id):
+    """
+    Finaliza a sessão de upload e cria o produto
+    ---
+    parameters:
+      - name: id
+        in: path
+        type: string
+        required: true
+        description: ID da sessão de upload
+    responses:
+      200:
+        description: Produto adicionado com sucesso
+        schema:
+          type: object
+          properties:
+            data:
+              type: object
+              properties:
+                id:
+                  type: string
+                  description: ID do produto
+                  example: '123e4567-e89b-12d3-a456-426614174000'
+            message:
+              type: string
+              description: Mensagem de sucesso
+              example: 'Product added successfully'
+            status:
+              type: integer
+              description: Código de status
+              example: 200
+      400:
+        description: Upload incompleto ou ZIP inválido (sessão descartada)
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              description: Mensagem de erro
+              example: 'Product not added. Upload incomplete'
+            status:
+              type: integer
+              description: Código de status
+              example: 400
+      404:
+        description: Sessão não encontrada ou expirada
+      409:
+        description: Uma parte está sendo gravada na sessão
+    """
+    upload_session = get_active_session(id)
+    if not upload_session:
+        return session_not_found()
+
+    if upload_session.upload_offset == 0 or (upload_session.size is not None and upload_session.upload_offset != upload_session.size):
+        json_response = {
+            "message": "Product not added. Upload incomplete",
+            "offset": upload_session.upload_offset,
+            "status": 400
+        }
+        return jsonify(json_response), 400
+
+    # Reserva a sessão no offset conferido para que nenhuma parte seja gravada enquanto o arquivo é lido
+    lease = claim_session(id, upload_session.upload_offset)
+    if lease is None:
+        return offset_conflict(id, "Product not added. A chunk is being written")
+
+    staging_path = upload_path(upload_session.staging_filename)
+    try:
+        filename = blob_filename(file_checksum(staging_path), upload_session.extention)
+        index_path(filename, staging_path)
+    except InvalidZip as e:
+        # Upload recusado: a sessão e o arquivo parcial são descartados
+        remove_staging_file(upload_session)
+        db.session.delete(upload_session)
+        db.session.commit()
+        json_response = {
+            "message": f"Product not added. Invalid ZIP file: {e}",
+            "status": 400
+        }
+        return jsonify(json_response), 400
+    except Exception:
+        release_session(id, lease)
+        raise
+    product = Product(name=upload_session.name, description=upload_session.description, file_zip_path=filename, id_user=upload_session.id_user)
+    db.session.add(product)
+    db.session.delete(upload_session)
+    db.session.commit()
+
+    # O arquivo só é gravado no armazenamento após o commit
+    get_storage().put_file(filename, staging_path)
+
+    json_response = {
+        "data": {"id": product.id},
+        "message": "Product added successfully",
+        "status": 200
+    }
+    return jsonify(json_response)
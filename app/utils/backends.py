@@ -0,0 +1,457 @@
+# Importações padrão do Python
+import collections
+import concurrent.futures
+import hashlib
+import io
+import os
+import re
+import tempfile
+
+# Importações do seu projeto
+from app.utils.upload import CHUNK_SIZE, move_into_place
+
+# Nome dos subdiretórios do layout local em dois níveis (dois dígitos hexadecimais)
+SHARD_NAME = re.compile(r'[0-9a-f]{2}')
+# Nome endereçado por conteúdo: SHA-256 (hex) do arquivo, seguido da extensão
+CONTENT_DIGEST = re.compile(r'[0-9a-f]{64}')
+
+# Prefixo da lápide: nome para onde o blob é movido enquanto o reclaimer confirma que ele está livre
+TOMBSTONE_PREFIX = '.reclaim-'
+
+# Metadados de um blob armazenado: nome (chave), tamanho em bytes e data de modificação (epoch)
+BlobInfo = collections.namedtuple('BlobInfo', 'name size mtime')
+
+
+def read_full(stream, size):
+    """Lê até size bytes de stream (read pode devolver menos que o pedido antes do fim)."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(parts)
+
+
+class StorageBackend:
+    """Interface de armazenamento dos blobs (arquivos ZIP dos produtos), identificados pelo nome.
+
+    As rotas e utilitários só usam estes métodos, então os arquivos podem ficar no disco
+    local ou num object store (S3 ou compatível) sem mudar o resto da aplicação.
+    """
+
+    def put_stream(self, key, stream):
+        """Grava o conteúdo de stream (lido em blocos até o fim) no blob key."""
+        raise NotImplementedError
+
+    def put_file(self, key, path):
+        """Grava o arquivo local path como blob key e remove path.
+
+        Os nomes são endereçados por conteúdo: se key já existe, o arquivo é só descartado.
+        """
+        if self.stat(key) is None:
+            with open(path, 'rb') as fp:
+                self.put_stream(key, fp)
+        os.remove(path)
+
+    def get_stream(self, key, start=0, stop=None):
+        """Retorna um gerador com os bytes [start, stop) do blob, em blocos de até CHUNK_SIZE.
+
+        O blob é aberto antes de o gerador ser devolvido (FileNotFoundError se não existe).
+        """
+        raise NotImplementedError
+
+    def read_range(self, key, start, stop):
+        """Lê os bytes [start, stop) do blob de uma vez (trechos pequenos: cabeçalhos, diretório central)."""
+        return b''.join(self.get_stream(key, start, stop))
+
+    def delete(self, key):
+        """Remove o blob; não faz nada se ele não existe."""
+        raise NotImplementedError
+
+    def stat(self, key):
+        """Retorna o BlobInfo do blob, ou None se ele não existe."""
+        raise NotImplementedError
+
+    def hide(self, key):
+        """Move o blob para a lápide (TOMBSTONE_PREFIX + nome), onde put_file e as leituras não o enxergam.
+
+        Retorna True se a lápide existe (movida agora ou deixada por uma tentativa anterior).
+        """
+        raise NotImplementedError
+
+    def restore(self, key):
+        """Devolve o blob da lápide ao seu nome; não faz nada se não há lápide."""
+        raise NotImplementedError
+
+    def purge(self, key):
+        """Remove a lápide do blob; não faz nada se ela não existe."""
+        raise NotImplementedError
+
+    def iter_blobs(self):
+        """Percorre os blobs armazenados, gerando um BlobInfo para cada um."""
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """Caminho do blob no disco local, quando houver (permite sendfile no download)."""
+        return None
+
+    def open(self, key):
+        """Abre o blob como arquivo binário somente leitura e com seek (usado pelo zipfile)."""
+        info = self.stat(key)
+        if info is None:
+            raise FileNotFoundError(key)
+        return io.BufferedReader(RangeReader(self, key, info.size), CHUNK_SIZE)
+
+
+class RangeReader(io.RawIOBase):
+    """Arquivo somente leitura, com seek, sobre um blob remoto: cada leitura vira um range-get."""
+
+    def __init__(self, backend, key, size):
+        self.backend = backend
+        self.key = key
+        self.size = size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError('Negative seek position')
+        self.position = offset
+        return self.position
+
+    def readinto(self, buffer):
+        stop = min(self.position + len(buffer), self.size)
+        if stop <= self.position:
+            return 0
+        data = self.backend.read_range(self.key, self.position, stop)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class LocalBackend(StorageBackend):
+    """Blobs no disco local, em dois níveis de subdiretórios: root/ab/cd/<nome>.
+
+    Os prefixos vêm do hash do conteúdo (no próprio nome) ou, para nomes antigos, do
+    SHA-256 do nome. Blobs ainda no layout antigo (direto em root) continuam sendo lidos.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        """Caminho do blob no layout em subdiretórios; é o único mapeamento nome -> caminho usado para gravar."""
+        digest = key.split('.')[0]
+        if not CONTENT_DIGEST.fullmatch(digest):
+            digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest[2:4], key)
+
+    def legacy_path(self, key):
+        return os.path.join(self.root, key)
+
+    def tombstone_path(self, key):
+        return os.path.join(os.path.dirname(self.path(key)), f'{TOMBSTONE_PREFIX}{key}')
+
+    def local_path(self, key):
+        """Caminho atual do blob: o layout em subdiretórios ou, enquanto shard_uploads.py não o migrou, a raiz."""
+        path = self.path(key)
+        if os.path.exists(path):
+            return path
+        legacy_path = self.legacy_path(key)
+        if os.path.exists(legacy_path):
+            return legacy_path
+        return None
+
+    def put_stream(self, key, stream):
+        fd, temp_path = tempfile.mkstemp(prefix='.upload-', suffix='.part', dir=self.root)
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    fp.write(chunk)
+                fp.flush()
+                os.fsync(fp.fileno())
+            move_into_place(temp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def put_file(self, key, path):
+        # Mesmo disco: basta renomear (atômico), sem copiar o conteúdo
+        if self.local_path(key) is not None:
+            os.remove(path)
+        else:
+            move_into_place(path, self.path(key))
+
+    def get_stream(self, key, start=0, stop=None):
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        fp = open(path, 'rb')
+
+        def generate():
+            with fp:
+                fp.seek(start)
+                remaining = None if stop is None else stop - start
+                while remaining is None or remaining > 0:
+                    chunk = fp.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        return
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+
+        return generate()
+
+    def read_range(self, key, start, stop):
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        with open(path, 'rb') as fp:
+            fp.seek(start)
+            return read_full(fp, stop - start)
+
+    def delete(self, key):
+        # Remove das duas localizações: a migração para subdiretórios pode estar em andamento
+        for path in (self.path(key), self.legacy_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def stat(self, key):
+        path = self.local_path(key)
+        if path is None:
+            return None
+        result = os.stat(path)
+        return BlobInfo(key, result.st_size, result.st_mtime)
+
+    def hide(self, key):
+        tombstone = self.tombstone_path(key)
+        os.makedirs(os.path.dirname(tombstone), exist_ok=True)
+        for path in (self.path(key), self.legacy_path(key)):
+            try:
+                os.replace(path, tombstone)
+            except FileNotFoundError:
+                continue
+        return os.path.exists(tombstone)
+
+    def restore(self, key):
+        try:
+            os.replace(self.tombstone_path(key), self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def purge(self, key):
+        tombstone = self.tombstone_path(key)
+        if os.path.exists(tombstone):
+            os.remove(tombstone)
+
+    def iter_blobs(self, folder=None, depth=0):
+        """Percorre com os.scandir os blobs da raiz (layout antigo) e dos subdiretórios ab/cd.
+
+        Temporários e arquivos de sessão (nomes iniciados por '.') não são blobs e ficam de fora.
+        """
+        with os.scandir(folder or self.root) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    result = entry.stat()
+                    yield BlobInfo(entry.name, result.st_size, result.st_mtime)
+                elif depth < 2 and entry.is_dir() and SHARD_NAME.fullmatch(entry.name):
+                    yield from self.iter_blobs(entry.path, depth + 1)
+
+    def open(self, key):
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        return open(path, 'rb')
+
+
+class S3Backend(StorageBackend):
+    """Blobs num bucket S3 ou compatível (MinIO, Ceph, moto_server...), com chave prefix + nome.
+
+    Arquivos maiores que part_size são enviados com multipart upload, com até workers
+    partes em paralelo; a memória usada fica limitada a workers * part_size. As credenciais
+    seguem a configuração padrão do boto3 (AWS_ACCESS_KEY_ID, ~/.aws/credentials...).
+    """
+
+    # O S3 exige partes de pelo menos 5 MB (menos a última) e no máximo 10.000 partes
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, part_size=8 * 1024 * 1024, workers=4):
+        import boto3
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.workers = max(workers, 1)
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            config=Config(max_pool_connections=max(10, self.workers * 2)),
+        )
+        self._client_error = ClientError
+
+    def _key(self, key):
+        return f'{self.prefix}{key}'
+
+    def _not_found(self, error):
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def put_stream(self, key, stream):
+        first = read_full(stream, self.part_size)
+        if len(first) < self.part_size:
+            self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=first)
+            return
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key))['UploadId']
+        try:
+            parts = self._upload_parts(key, upload_id, first, stream)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                MultipartUpload={'Parts': parts},
+            )
+        except BaseException:
+            # Sem o abort, as partes já enviadas ficariam cobradas no bucket
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+            raise
+
+    def _upload_part(self, key, upload_id, number, data):
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self._key(key), UploadId=upload_id, PartNumber=number, Body=data,
+        )
+        return {'PartNumber': number, 'ETag': response['ETag']}
+
+    def _upload_parts(self, key, upload_id, first, stream):
+        """Envia as partes em paralelo enquanto lê as próximas; no máximo workers partes em memória."""
+        parts = []
+        pending = set()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            data = first
+            number = 1
+            while data:
+                if len(pending) >= self.workers:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+                pending.add(executor.submit(self._upload_part, key, upload_id, number, data))
+                number += 1
+                data = read_full(stream, self.part_size)
+            parts.extend(future.result() for future in concurrent.futures.as_completed(pending))
+        return sorted(parts, key=lambda part: part['PartNumber'])
+
+    def get_stream(self, key, start=0, stop=None):
+        if stop is not None and stop <= start:
+            return iter(())
+        kwargs = {}
+        if start or stop is not None:
+            kwargs['Range'] = f"bytes={start}-{'' if stop is None else stop - 1}"
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self._key(key), **kwargs)['Body']
+        except self._client_error as e:
+            if self._not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+        def generate():
+            try:
+                yield from body.iter_chunks(CHUNK_SIZE)
+            finally:
+                body.close()
+
+        return generate()
+
+    def read_range(self, key, start, stop):
+        if stop <= start:
+            return b''
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f'bytes={start}-{stop - 1}')
+        except self._client_error as e:
+            if self._not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+        with response['Body'] as body:
+            return body.read()
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def stat(self, key):
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self._client_error as e:
+            if self._not_found(e):
+                return None
+            raise
+        return BlobInfo(key, response['ContentLength'], response['LastModified'].timestamp())
+
+    def _move(self, source, target):
+        """Copia source para target no próprio bucket (cópia gerenciada, em partes se grande) e remove source.
+
+        Retorna False se source não existe.
+        """
+        try:
+            self.client.copy({'Bucket': self.bucket, 'Key': self._key(source)}, self.bucket, self._key(target))
+        except self._client_error as e:
+            if self._not_found(e):
+                return False
+            raise
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(source))
+        return True
+
+    def hide(self, key):
+        # Sem rename no S3: cópia + delete. Até o delete o blob ainda é visível, o que é seguro,
+        # já que a recontagem do reclaimer só acontece depois
+        tombstone = f'{TOMBSTONE_PREFIX}{key}'
+        return self._move(key, tombstone) or self.stat(tombstone) is not None
+
+    def restore(self, key):
+        self._move(f'{TOMBSTONE_PREFIX}{key}', key)
+
+    def purge(self, key):
+        self.delete(f'{TOMBSTONE_PREFIX}{key}')
+
+    def iter_blobs(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get('Contents', []):
+                name = item['Key'][len(self.prefix):]
+                # Lápides (nomes iniciados por '.') não são blobs
+                if not name.startswith('.'):
+                    yield BlobInfo(name, item['Size'], item['LastModified'].timestamp())
+
+
+def make_storage_backend(config):
+    """Cria o backend de armazenamento configurado em STORAGE_BACKEND: 'local' (UPLOAD_FOLDER) ou 's3'."""
+    backend = config['STORAGE_BACKEND']
+    if backend == 'local':
+        return LocalBackend(config['UPLOAD_FOLDER'])
+    if backend == 's3':
+        if not config['STORAGE_S3_BUCKET']:
+            raise ValueError('STORAGE_BACKEND=s3 requires STORAGE_S3_BUCKET')
+        try:
+            return S3Backend(
+                config['STORAGE_S3_BUCKET'],
+                prefix=config['STORAGE_S3_PREFIX'],
+                endpoint_url=config['STORAGE_S3_ENDPOINT_URL'],
+                region=config['STORAGE_S3_REGION'],
+                part_size=config['STORAGE_S3_PART_SIZE'],
+                workers=config['STORAGE_S3_WORKERS'],
+            )
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the 'boto3' package") from e
+    raise ValueError(f'Unknown storage backend: {backend}')
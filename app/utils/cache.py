@@ -0,0 +1,196 @@
+# Importações padrão do Python
+import collections
+import datetime
+import json
+import threading
+import time
+
+# Importações de extensões Flask
+from sqlalchemy import DateTime
+from sqlalchemy.orm import make_transient_to_detached
+
+
+class LRUCache:
+    """Cache em memória do processo, com limite de itens (LRU) e tempo de vida (TTL)."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalSharedBackend:
+    """Substituto local de um cache compartilhado (mesma interface get/set/delete do cliente Redis)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+
+def make_shared_backend(backend, url=None):
+    """Cria o backend compartilhado configurado: '' (nenhum), 'local' ou 'redis'."""
+    if not backend:
+        return None
+    if backend == 'local':
+        return LocalSharedBackend()
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        return redis.Redis.from_url(url)
+    raise ValueError(f'Unknown cache backend: {backend}')
+
+
+class ReadThroughCache:
+    """Cache read-through por id de entidade: memória local ou backend compartilhado e, por fim, o banco.
+
+    Os valores são dicts serializáveis em JSON, para poderem ir ao backend compartilhado.
+    Com backend compartilhado a memória local não é usada: invalidate() não alcança a
+    memória dos outros processos, que serviriam a cópia antiga até o TTL.
+    """
+
+    def __init__(self, name, maxsize=10000, ttl=60, shared=None):
+        self.name = name
+        self.ttl = ttl
+        self.local = LRUCache(maxsize, ttl)
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app, shared=None):
+        """Aplica CACHE_MAXSIZE e CACHE_TTL do app e liga o backend compartilhado (esvazia o cache local)."""
+        self.ttl = app.config['CACHE_TTL']
+        self.local = LRUCache(app.config['CACHE_MAXSIZE'], self.ttl)
+        self.shared = shared
+
+    def _shared_key(self, key):
+        return f'miniboxdrop:{self.name}:{key}'
+
+    def get_or_load(self, key, loader):
+        """Retorna o valor em cache ou chama loader() e guarda o resultado (None não é guardado)."""
+        if self.shared is not None:
+            raw = self.shared.get(self._shared_key(key))
+            value = json.loads(raw) if raw is not None else None
+        else:
+            value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = loader()
+        if value is not None:
+            if self.shared is not None:
+                self.shared.set(self._shared_key(key), json.dumps(value), ex=self.ttl)
+            else:
+                self.local.set(key, value)
+        return value
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None and keys:
+            self.shared.delete(*[self._shared_key(key) for key in keys])
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self.local),
+        }
+
+
+def cached_columns(model):
+    """Colunas do modelo que vão para o cache; as listadas em model.cache_exclude (segredos) ficam de fora."""
+    exclude = getattr(model, 'cache_exclude', ())
+    return [column for column in model.__table__.columns if column.key not in exclude]
+
+def entity_to_cache(entity):
+    """Converte as colunas de uma entidade em dict serializável (None se a entidade não existe)."""
+    if entity is None:
+        return None
+    data = {}
+    for column in cached_columns(type(entity)):
+        value = getattr(entity, column.key)
+        data[column.key] = value.isoformat() if isinstance(value, datetime.datetime) else value
+    return data
+
+def cached_row(cache, model, id):
+    """Busca as colunas da entidade pelo id passando pelo cache (dict ou None), sem instanciar o ORM em um hit."""
+    from app import db
+
+    return cache.get_or_load(id, lambda: entity_to_cache(db.session.get(model, id)))
+
+def entity_from_cache(model, data):
+    """Reconstrói a entidade a partir do dict em cache e a associa à sessão sem consultar o banco.
+
+    As colunas fora do cache ficam expiradas e são carregadas do banco no primeiro acesso.
+    """
+    from app import db
+
+    values = {}
+    for column in cached_columns(model):
+        value = data.get(column.key)
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.datetime.fromisoformat(value)
+        values[column.key] = value
+    entity = model(**values)
+    make_transient_to_detached(entity)
+    return db.session.merge(entity, load=False)
+
+def cached_get(cache, model, id):
+    """Busca a entidade pelo id passando pelo cache e a devolve associada à sessão, sem consultar o banco em um hit."""
+    data = cached_row(cache, model, id)
+    if data is None:
+        return None
+    return entity_from_cache(model, data)
@@ -0,0 +1,45 @@
+# Importações padrão do Python
+import datetime
+import hashlib
+
+# Importações do Flask e extensões
+from flask import Response, request
+
+
+def http_date(updated_at):
+    """Converte updated_at (datetime local sem fuso ou string ISO) para datetime em UTC, sem microssegundos."""
+    if updated_at is None:
+        return None
+    if isinstance(updated_at, str):
+        updated_at = datetime.datetime.fromisoformat(updated_at)
+    return updated_at.astimezone(datetime.timezone.utc).replace(microsecond=0)
+
+def row_etag(id, updated_at):
+    """ETag de uma linha, derivado do id e do updated_at."""
+    if isinstance(updated_at, datetime.datetime):
+        updated_at = updated_at.isoformat()
+    return hashlib.sha1(f'{id}:{updated_at}'.encode()).hexdigest()
+
+def collection_etag(*parts):
+    """ETag de uma coleção, derivado da marca d'água (versão da tabela) e dos parâmetros da requisição."""
+    key = ':'.join(str(part) for part in parts)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def with_validators(response, etag, updated_at):
+    """Adiciona ETag e Last-Modified (quando existem) à resposta e pede revalidação ao cliente."""
+    if etag:
+        response.set_etag(etag)
+    response.last_modified = http_date(updated_at)
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag, updated_at):
+    """Retorna uma resposta 304 se o cliente já tem a versão atual (If-None-Match / If-Modified-Since), senão None."""
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    else:
+        last_modified = http_date(updated_at)
+        matched = bool(last_modified and request.if_modified_since and last_modified <= request.if_modified_since)
+    if not matched:
+        return None
+    return with_validators(Response(status=304), etag, updated_at)
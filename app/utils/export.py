@@ -0,0 +1,26 @@
+# Importações do Flask e extensões
+from flask import Response, request, current_app, stream_with_context
+
+# Importações do seu projeto
+from app import db
+
+
+def wants_ndjson():
+    """Verifica se o cliente pediu a exportação em NDJSON (?format=ndjson ou Accept: application/x-ndjson)."""
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+def ndjson_response(stmt, to_dict):
+    """Transmite o resultado do SELECT stmt como NDJSON, um registro por linha.
+
+    As linhas são buscadas em lotes com yield_per, então a memória não cresce
+    com o tamanho da tabela e o primeiro byte sai assim que o primeiro lote chega.
+    """
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+
+    def generate():
+        for row in db.session.execute(stmt.execution_options(yield_per=batch_size)):
+            yield current_app.json.dumps(to_dict(row)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,100 @@
+# Importações padrão do Python
+import collections
+import datetime
+
+# Importações do Flask e extensões
+from flask import request
+from sqlalchemy import func
+
+# Filtros de intervalo por data das listagens: parâmetro -> (coluna, operador)
+DATE_RANGE_PARAMS = {
+    'created_after': ('created_at', '>='),
+    'created_before': ('created_at', '<'),
+    'updated_after': ('updated_at', '>='),
+    'updated_before': ('updated_at', '<'),
+}
+
+# Filtros e ordenação de uma listagem: coluna e sentido da ordenação, dono (id_user) e
+# intervalos (coluna, operador, valor), em qualquer uma das colunas
+Listing = collections.namedtuple('Listing', 'sort_key descending owner ranges')
+
+
+def parse_datetime(value, param):
+    """Converte uma data ISO 8601 (com ou sem hora/fuso) para datetime local sem fuso, como no banco."""
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f'Invalid {param}. Use an ISO 8601 date (ex. 2024-01-31 or 2024-01-31T12:00:00)') from e
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def prefix_range(prefix):
+    """Intervalo [prefix, limite) com todos os textos que começam com prefix (comparação binária,
+    diferencia maiúsculas); o limite é prefix com o último caractere incrementado."""
+    ranges = [('name', '>=', prefix)]
+    last = ord(prefix[-1])
+    if last < 0x10FFFF:
+        ranges.append(('name', '<', prefix[:-1] + chr(last + 1)))
+    return ranges
+
+def listing_args(sort_keys, owner_param=None):
+    """Lê da requisição os filtros (name, created_*, updated_*, owner_param) e a ordenação (sort).
+
+    Filtros em colunas diferentes podem ser combinados (veja index_key). Sem sort, a
+    ordenação segue o primeiro filtro usado (ou created_at). Lança ValueError com a
+    mensagem para o cliente.
+    """
+    ranges = []
+    for param, (key, operator) in DATE_RANGE_PARAMS.items():
+        value = request.args.get(param)
+        if value:
+            ranges.append((key, operator, parse_datetime(value, param)))
+    prefix = request.args.get('name')
+    if prefix:
+        ranges.extend(prefix_range(prefix))
+
+    range_keys = list(dict.fromkeys(key for key, _, _ in ranges))
+
+    sort = request.args.get('sort')
+    if sort:
+        descending = sort.startswith('-')
+        sort_key = sort[1:] if descending else sort
+        if sort_key not in sort_keys:
+            allowed = ', '.join(f'{key}, -{key}' for key in sort_keys)
+            raise ValueError(f'Invalid sort. Allowed: {allowed}')
+    else:
+        sort_key = range_keys[0] if range_keys else 'created_at'
+        descending = False
+
+    owner = request.args.get(owner_param) if owner_param else None
+    return Listing(sort_key, descending, owner, ranges)
+
+def index_key(listing):
+    """Coluna do índice (coluna, id) ou (id_user, coluna, id) que conduz a consulta da listagem.
+
+    É a coluna de ordenação quando ela tem filtro (ou não há filtros): a busca percorre o
+    intervalo já na ordem da página. Senão é a primeira coluna filtrada: a busca fica
+    limitada ao intervalo e só as linhas dele são ordenadas. Os demais intervalos são
+    conferidos linha a linha (filtros residuais).
+    """
+    range_keys = [key for key, _, _ in listing.ranges]
+    if not range_keys or listing.sort_key in range_keys:
+        return listing.sort_key
+    return range_keys[0]
+
+def apply_listing(stmt, model, listing, owner=None):
+    """Aplica ao SELECT stmt o filtro de dono (listing.owner ou owner) e os intervalos da listagem.
+
+    Os intervalos da coluna de index_key vão em unlikely() (seletivos para o planejador do
+    SQLite), para que a busca use o índice dela mesmo sem ANALYZE.
+    """
+    owner = owner or listing.owner
+    if owner:
+        stmt = stmt.where(model.id_user == owner)
+    driving = index_key(listing)
+    for key, operator, value in listing.ranges:
+        column = getattr(model, key)
+        condition = column >= value if operator == '>=' else column < value
+        stmt = stmt.where(func.unlikely(condition) if key == driving else condition)
+    return stmt
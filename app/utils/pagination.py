@@ -0,0 +1,71 @@
+# Importações padrão do Python
+import base64
+import datetime
+import json
+
+# Importações do Flask e extensões
+from flask import request, current_app
+from sqlalchemy import DateTime, tuple_
+
+# Importações do seu projeto
+from app import db
+
+
+def encode_cursor(value, id):
+    """Gera um cursor opaco a partir da chave (coluna de ordenação, id) da última linha da página."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor, column):
+    """Decodifica o cursor opaco com o valor no tipo de column. Lança ValueError se o cursor for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, id = json.loads(raw)
+        if isinstance(column.type, DateTime):
+            value = datetime.datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            raise ValueError('Invalid cursor value')
+        return value, str(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def page_args():
+    """Lê os parâmetros limit e cursor da requisição, limitando o tamanho da página."""
+    limit = request.args.get('limit', current_app.config['PAGE_SIZE_DEFAULT'], type=int)
+    limit = max(1, min(limit, current_app.config['PAGE_SIZE_MAX']))
+    return limit, request.args.get('cursor')
+
+def keyset_order(model, sort_key='created_at', descending=False):
+    """ORDER BY da paginação: a coluna de ordenação e o id como desempate, no mesmo sentido."""
+    columns = (getattr(model, sort_key), model.id)
+    return [column.desc() for column in columns] if descending else list(columns)
+
+def keyset_select(stmt, model, cursor, limit, sort_key='created_at', descending=False):
+    """Aplica ao SELECT stmt o cursor, a ordenação (sort_key, id) e o LIMIT de uma página (limit + 1 linhas).
+
+    A página é buscada com WHERE (sort_key, id) > cursor (ou < na ordem decrescente) em vez
+    de OFFSET, então qualquer página custa o mesmo que a primeira. Lança ValueError se o
+    cursor for inválido.
+    """
+    column = getattr(model, sort_key)
+    if cursor:
+        value, id = decode_cursor(cursor, column)
+        key, bound = tuple_(column, model.id), tuple_(value, id)
+        stmt = stmt.where(key < bound if descending else key > bound)
+    return stmt.order_by(*keyset_order(model, sort_key, descending)).limit(limit + 1)
+
+def keyset_page(stmt, model, cursor, limit, sort_key='created_at', descending=False):
+    """Retorna uma página do SELECT stmt ordenada por (sort_key, id) e o cursor da próxima página.
+
+    stmt deve selecionar sort_key e id (veja projection); as linhas voltam como tuplas,
+    sem instanciar o ORM.
+    """
+    rows = db.session.execute(keyset_select(stmt, model, cursor, limit, sort_key, descending)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], sort_key), rows[-1].id)
+    return rows, next_cursor
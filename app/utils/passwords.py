@@ -0,0 +1,62 @@
+# Importações padrão do Python
+import concurrent.futures
+import threading
+
+# Importações do Flask e extensões
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasher:
+    """Executa os hashes de senha (KDF caro) num pool limitado de threads.
+
+    scrypt/pbkdf2 liberam o GIL, então o pool usa até PASSWORD_HASH_WORKERS núcleos;
+    com mais de PASSWORD_HASH_QUEUE operações pendentes a requisição recebe 503 em vez
+    de ocupar mais uma thread esperando.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._canonical_method = None
+        self._lock = threading.Lock()
+
+    def _setup(self):
+        with self._lock:
+            if self._executor is None:
+                config = current_app.config
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=config['PASSWORD_HASH_WORKERS'], thread_name_prefix='password-hash'
+                )
+                self._slots = threading.BoundedSemaphore(config['PASSWORD_HASH_QUEUE'])
+                # Forma completa do método (ex. 'scrypt' -> 'scrypt:32768:8:1'), como fica gravada no hash
+                self._canonical_method = generate_password_hash('', config['PASSWORD_HASH_METHOD'], 1).split('$')[0]
+
+    def _run(self, fn, *args):
+        self._setup()
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailable('Too many password operations in progress, try again')
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Gera o hash da senha com os parâmetros configurados."""
+        config = current_app.config
+        return self._run(generate_password_hash, password, config['PASSWORD_HASH_METHOD'], config['PASSWORD_SALT_LENGTH'])
+
+    def verify(self, pwhash, password):
+        """Verifica a senha contra o hash gravado (uma única execução do KDF)."""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Indica se o hash gravado usa parâmetros diferentes dos configurados."""
+        self._setup()
+        method, _, rest = pwhash.partition('$')
+        salt = rest.partition('$')[0]
+        return method != self._canonical_method or len(salt) != current_app.config['PASSWORD_SALT_LENGTH']
+
+
+password_hasher = PasswordHasher()
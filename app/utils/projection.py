@@ -0,0 +1,27 @@
+# Importações do Flask e extensões
+from flask import request
+from sqlalchemy import select
+
+
+def field_args(columns):
+    """Lê o parâmetro fields (ex.: ?fields=id,name) e retorna as colunas pedidas, na ordem pedida.
+
+    Sem o parâmetro, retorna todas as colunas permitidas. Lança ValueError para colunas desconhecidas.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return list(columns)
+    fields = list(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    if not fields or any(field not in columns for field in fields):
+        raise ValueError('Invalid fields')
+    return fields
+
+def projection(model, fields, sort_key='created_at'):
+    """SELECT (Core) só das colunas pedidas, mais sort_key e id no fim (chave do cursor da paginação)."""
+    table = model.__table__
+    keys = fields + [key for key in (sort_key, 'id') if key not in fields]
+    return select(*[table.c[key] for key in keys])
+
+def row_to_dict(fields, row):
+    """Monta o dict da resposta direto da tupla da linha (as colunas extras do fim são ignoradas)."""
+    return dict(zip(fields, row))
@@ -0,0 +1,140 @@
+# Importações padrão do Python
+import itertools
+import threading
+import time
+
+# Importações do Flask e extensões
+from flask import current_app
+from sqlalchemy import insert
+
+# Importações do seu projeto
+from app import db
+from app.models.models import FileReclaim, Product, UploadSession
+from app.utils.storage import get_storage, iter_staging_files, release_blob
+
+
+def enqueue(filenames):
+    """Adiciona arquivos à fila durável de remoção na transação atual (o commit fica com quem chama)."""
+    db.session.add_all([FileReclaim(filename=filename) for filename in filenames if filename])
+
+def enqueue_select(select_stmt):
+    """Adiciona à fila, com um único INSERT ... SELECT, os nomes de arquivo retornados por select_stmt."""
+    db.session.execute(insert(FileReclaim).from_select(['filename'], select_stmt))
+
+def drain():
+    """Processa a fila durável em lotes e retorna quantos itens foram removidos dela.
+
+    Cada arquivo só é apagado se nenhum produto o referencia (release_blob). Itens que
+    falham ganham uma tentativa a mais e ficam na fila até RECLAIM_MAX_ATTEMPTS.
+    """
+    batch_size = current_app.config['RECLAIM_BATCH_SIZE']
+    max_attempts = current_app.config['RECLAIM_MAX_ATTEMPTS']
+    done = 0
+    last_id = 0
+    while True:
+        items = (FileReclaim.query
+                 .filter(FileReclaim.id > last_id, FileReclaim.attempts < max_attempts)
+                 .order_by(FileReclaim.id)
+                 .limit(batch_size)
+                 .all())
+        if not items:
+            return done
+        released = []
+        for item in items:
+            try:
+                release_blob(item.filename)
+                released.append(item.id)
+            except Exception as e:
+                item.attempts += 1
+                item.last_error = str(e)[:512]
+                current_app.logger.warning('Error deleting the file %s: %s', item.filename, e)
+        last_id = items[-1].id
+        # DELETE em conjunto: outro worker pode ter processado o mesmo item ao mesmo tempo
+        FileReclaim.query.filter(FileReclaim.id.in_(released)).delete(synchronize_session=False)
+        db.session.commit()
+        done += len(released)
+
+def reconcile():
+    """Percorre o armazenamento e o UPLOAD_FOLDER em lotes e enfileira os arquivos órfãos. Retorna quantos foram enfileirados.
+
+    Os blobs vêm de iter_blobs do backend e os temporários/sessões da raiz do UPLOAD_FOLDER,
+    sem listagem completa em memória; cada lote é comparado com Product.file_zip_path e com
+    as sessões de upload ativas. Arquivos modificados há menos de RECLAIM_GRACE_SECONDS são ignorados (uploads em andamento).
+    """
+    batch_size = current_app.config['RECLAIM_BATCH_SIZE']
+    cutoff = time.time() - current_app.config['RECLAIM_GRACE_SECONDS']
+    queued = 0
+    batch = []
+    for entry in itertools.chain(iter_staging_files(), get_storage().iter_blobs()):
+        if entry.mtime < cutoff:
+            batch.append(entry.name)
+        if len(batch) >= batch_size:
+            queued += reconcile_batch(batch)
+            batch = []
+    if batch:
+        queued += reconcile_batch(batch)
+    return queued
+
+def reconcile_batch(names):
+    referenced = {row.file_zip_path for row in db.session.query(Product.file_zip_path).filter(Product.file_zip_path.in_(names))}
+    session_ids = [name[len('.session-'):-len('.part')] for name in names if name.startswith('.session-')]
+    active_sessions = {
+        UploadSession.staging_filename_for(row.id)
+        for row in db.session.query(UploadSession.id).filter(UploadSession.id.in_(session_ids))
+    }
+    already_queued = {row.filename for row in db.session.query(FileReclaim.filename).filter(FileReclaim.filename.in_(names))}
+
+    keep = referenced | active_sessions | already_queued
+    orphans = [name for name in names if name not in keep]
+    enqueue(orphans)
+    db.session.commit()
+    return len(orphans)
+
+
+class FileReclaimer:
+    """Worker em segundo plano que consome a fila durável de remoção de arquivos.
+
+    As rotas gravam os arquivos na fila (file_reclaims) na mesma transação da alteração
+    e chamam wake() após o commit. O worker sobe na primeira requisição de cada processo
+    (depois do fork, nos servidores pre-fork), já drenando o que um processo que caiu
+    deixou na fila, e acorda a cada RECLAIM_INTERVAL segundos. Scripts que criam o app
+    sem atender requisições não o iniciam (use reclaim_files.py).
+    """
+
+    def __init__(self, flask_app=None):
+        self.app = flask_app
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, flask_app):
+        self.app = flask_app
+        flask_app.before_request(self._start_on_request)
+
+    def _start_on_request(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.wake()
+
+    def wake(self):
+        """Acorda o worker (iniciando-o se necessário) para processar a fila."""
+        self._ensure_started()
+        self._wake.set()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='file-reclaimer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.app.config['RECLAIM_INTERVAL'])
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    drain()
+            except Exception:
+                self.app.logger.exception('Error draining the file reclamation queue')
+
+
+reclaimer = FileReclaimer()
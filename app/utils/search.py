@@ -0,0 +1,213 @@
+# Importações padrão do Python
+import base64
+import html
+import json
+import re
+
+# Importações do Flask e extensões
+from sqlalchemy import text
+
+# Importações do seu projeto
+from app import db
+
+# Índice de busca textual (SQLite FTS5) sobre products.name e products.description.
+# É uma tabela de conteúdo externo: guarda só o índice invertido e lê o texto pela chave.
+# A chave vem de products_search_keys, cuja INTEGER PRIMARY KEY é estável (o rowid
+# implícito de products, com chave primária textual, pode ser renumerado por um VACUUM);
+# a view products_search_content liga a chave ao produto pelo id. Os triggers mantêm
+# chaves e índice em sincronia com qualquer escrita em products.
+SEARCH_DDL = (
+    """CREATE TABLE IF NOT EXISTS products_search_keys (
+        search_key INTEGER PRIMARY KEY,
+        product_id VARCHAR(36) NOT NULL UNIQUE
+    )""",
+    """CREATE VIEW IF NOT EXISTS products_search_content AS
+        SELECT k.search_key, p.name, p.description
+        FROM products_search_keys AS k
+        JOIN products AS p ON p.id = k.product_id""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description,
+        content='products_search_content', content_rowid='search_key',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_search_keys (product_id) VALUES (new.id);
+        INSERT INTO products_fts (rowid, name, description)
+            SELECT search_key, new.name, new.description FROM products_search_keys WHERE product_id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, description)
+            SELECT 'delete', search_key, old.name, old.description FROM products_search_keys WHERE product_id = old.id;
+        DELETE FROM products_search_keys WHERE product_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, description)
+            SELECT 'delete', search_key, old.name, old.description FROM products_search_keys WHERE product_id = old.id;
+        INSERT INTO products_fts (rowid, name, description)
+            SELECT search_key, new.name, new.description FROM products_search_keys WHERE product_id = new.id;
+    END""",
+)
+
+# Acerta as chaves com products (produtos gravados antes dos triggers ou removidos sem eles);
+# as novas seguem a ordem de criação, que a janela de ranqueamento usa como "mais recentes"
+SYNC_KEYS_SQL = (
+    "DELETE FROM products_search_keys WHERE product_id NOT IN (SELECT id FROM products)",
+    """INSERT INTO products_search_keys (product_id)
+        SELECT id FROM products WHERE id NOT IN (SELECT product_id FROM products_search_keys)
+        ORDER BY created_at, id""",
+)
+
+# Estrutura da migração 5, indexada pelo rowid implícito de products (substituída na migração 8)
+LEGACY_SEARCH_OBJECTS = (
+    'DROP TRIGGER IF EXISTS products_fts_insert',
+    'DROP TRIGGER IF EXISTS products_fts_delete',
+    'DROP TRIGGER IF EXISTS products_fts_update',
+    'DROP TABLE IF EXISTS products_fts',
+)
+
+# Ranking padrão da tabela (coluna rank): bm25 com um termo no nome valendo mais que na descrição.
+# Com ORDER BY rank o FTS5 ordena internamente, sem calcular a função de novo na consulta
+RANK_FUNCTION = 'bm25(10.0, 1.0)'
+# Marcadores usados pelo SQLite no destaque; trocados por <mark> depois de escapar o texto
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+# Quantidade de tokens do trecho da descrição (snippet)
+SNIPPET_TOKENS = 16
+# Tamanho mínimo de um termo com * para casar como prefixo: prefixos curtos juntam os
+# doclists de muitos termos e quase todas as linhas teriam de ser lidas
+PREFIX_MIN_LENGTH = 3
+
+SEARCH_SQL = text(f"""
+    SELECT p.id, p.name, p.description, p.file_zip_path, p.id_user, p.created_at, p.updated_at,
+           highlight(products_fts, 0, :start, :end) AS name_highlight,
+           snippet(products_fts, 1, :start, :end, '…', {SNIPPET_TOKENS}) AS description_snippet,
+           products_fts.rank AS score
+    FROM products_fts
+    JOIN products_search_keys AS k ON k.search_key = products_fts.rowid
+    JOIN products AS p ON p.id = k.product_id
+    WHERE products_fts MATCH :query AND products_fts.rowid > :floor
+    ORDER BY products_fts.rank
+    LIMIT :limit OFFSET :offset
+""").columns(created_at=db.DateTime, updated_at=db.DateTime)
+
+# Chave (rowid do índice) a partir da qual estão os :window resultados mais recentes (o FTS5 percorre o doclist
+# em ordem decrescente de chave e para no deslocamento, sem ranquear nada)
+WINDOW_FLOOR_SQL = text("""
+    SELECT rowid FROM products_fts
+    WHERE products_fts MATCH :query
+    ORDER BY rowid DESC
+    LIMIT 1 OFFSET :window
+""")
+
+TERM = re.compile(r'(\w+)(\*?)')
+
+
+def create_search_index(connection):
+    """Cria as chaves, a tabela FTS5 e os triggers de sincronia (idempotente) e indexa as linhas já existentes."""
+    for statement in SEARCH_DDL + SYNC_KEYS_SQL:
+        connection.execute(text(statement))
+    connection.execute(text("INSERT INTO products_fts (products_fts, rank) VALUES ('rank', :rank)"), {'rank': RANK_FUNCTION})
+    connection.execute(text("INSERT INTO products_fts (products_fts) VALUES ('rebuild')"))
+
+def replace_legacy_search_index(connection):
+    """Troca o índice da migração 5 (ligado ao rowid implícito de products) pelo ligado às chaves estáveis."""
+    for statement in LEGACY_SEARCH_OBJECTS:
+        connection.execute(text(statement))
+    create_search_index(connection)
+
+def rebuild_search_index():
+    """Refaz o índice inteiro a partir de products (dados gravados sem os triggers ou índice corrompido)."""
+    with db.engine.begin() as connection:
+        create_search_index(connection)
+        connection.execute(text("INSERT INTO products_fts (products_fts) VALUES ('optimize')"))
+
+def search_available():
+    return db.engine.dialect.name == 'sqlite'
+
+def match_query(q):
+    """Converte o texto digitado numa expressão MATCH segura: todos os termos (AND), entre aspas.
+
+    Um termo terminado em * (com PREFIX_MIN_LENGTH caracteres ou mais) casa como prefixo;
+    o resto da sintaxe do FTS5 é ignorado. Retorna None se não há termos.
+    """
+    terms = []
+    for term, star in TERM.findall(q or ''):
+        prefix = '*' if star and len(term) >= PREFIX_MIN_LENGTH else ''
+        terms.append(f'"{term}"{prefix}')
+    if not terms:
+        return None
+    return ' '.join(terms)
+
+def mark(value):
+    """Escapa o texto destacado pelo SQLite e troca os marcadores por <mark>."""
+    if value is None:
+        return None
+    return html.escape(value).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+def encode_cursor(offset, floor):
+    raw = json.dumps([offset, floor]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodifica o cursor da busca (deslocamento no ranking e piso de chave). Lança ValueError se o cursor for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        offset, floor = (int(value) for value in json.loads(raw))
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if offset < 0 or floor < 0:
+        raise ValueError('Invalid cursor')
+    return offset, floor
+
+def window_floor(query, window):
+    """Piso de chave da janela de ranqueamento: 0 se a busca tem até window resultados (ou window é 0)."""
+    if not window:
+        return 0
+    floor = db.session.execute(WINDOW_FLOOR_SQL, {'query': query, 'window': window}).scalar()
+    return floor or 0
+
+def search_products(query, cursor, limit, window):
+    """Busca os produtos que contêm todos os termos de query, ordenados por relevância (bm25).
+
+    O bm25 precisa pontuar todos os resultados antes de ordenar, então buscas amplas (termos
+    presentes em boa parte dos produtos) são ranqueadas só entre os window resultados mais
+    recentes; as demais são ranqueadas por inteiro. O ranking depende do conjunto de
+    resultados, então a paginação é por deslocamento, e o cursor guarda também o piso da
+    janela para as páginas seguintes usarem o mesmo conjunto.
+    Retorna as linhas da página, o cursor da próxima e se a janela deixou resultados mais
+    antigos de fora (truncated).
+    """
+    if cursor:
+        offset, floor = decode_cursor(cursor)
+    else:
+        offset, floor = 0, window_floor(query, window)
+    rows = db.session.execute(SEARCH_SQL, {
+        'query': query,
+        'start': HIGHLIGHT_START,
+        'end': HIGHLIGHT_END,
+        'floor': floor,
+        'limit': limit + 1,
+        'offset': offset,
+    }).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(offset + limit, floor)
+    return rows, next_cursor, floor > 0
+
+def search_result_to_dict(row):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'description': row.description,
+        'file_zip_path': row.file_zip_path,
+        'id_user': row.id_user,
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+        'highlight': {
+            'name': mark(row.name_highlight),
+            'description': mark(row.description_snippet),
+        },
+        'score': -row.score,
+    }
@@ -0,0 +1,68 @@
+# Importações padrão do Python
+import dataclasses
+import datetime
+import decimal
+import uuid
+
+# Importações do Flask e extensões
+from flask.json.provider import DefaultJSONProvider
+
+
+def _default(o):
+    """Tipos que o encoder não conhece: datas em ISO 8601, Decimal/UUID como texto."""
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """Provider com a biblioteca padrão: saída compacta, sem ordenar chaves e datas em ISO 8601."""
+
+    default = staticmethod(_default)
+    sort_keys = False
+    compact = True
+
+
+class OrjsonProvider(CompactJSONProvider):
+    """Provider com orjson: serializa datetime nativamente e gera bytes direto para a resposta."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # Opções específicas do json padrão (indent, sort_keys...)
+            return super().dumps(obj, **kwargs)
+        return self._orjson.dumps(obj, default=_default, option=self._options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._orjson.dumps(obj, default=_default, option=self._options | self._orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def make_json_provider(app):
+    """Cria o provider de JSON configurado em JSON_PROVIDER: 'auto' (orjson se instalado), 'orjson' ou 'stdlib'."""
+    name = app.config['JSON_PROVIDER']
+    if name not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'Unknown JSON provider: {name}')
+    if name != 'stdlib':
+        try:
+            return OrjsonProvider(app)
+        except ImportError as e:
+            if name == 'orjson':
+                raise RuntimeError("JSON_PROVIDER=orjson requires the 'orjson' package") from e
+    return CompactJSONProvider(app)
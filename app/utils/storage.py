@@ -0,0 +1,116 @@
+# Importações padrão do Python
+import os
+
+# Importações do Flask e extensões
+from flask import current_app
+from sqlalchemy import func, select
+from werkzeug.utils import secure_filename
+
+# Importações do seu projeto
+from app import db
+from app.models.models import Product, ZipEntry
+from app.utils.backends import CONTENT_DIGEST, BlobInfo, LocalBackend
+from app.utils.upload import move_into_place
+
+
+def get_storage():
+    """Backend de armazenamento dos blobs do app atual (veja backends.make_storage_backend)."""
+    return current_app.extensions['storage']
+
+def upload_path(filename):
+    """Caminho do arquivo direto no UPLOAD_FOLDER do app atual (temporários e sessões de upload, sempre locais)."""
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+
+def iter_staging_files():
+    """Percorre com os.scandir os temporários e arquivos de sessão (nomes iniciados por '.') da raiz do UPLOAD_FOLDER."""
+    with os.scandir(current_app.config['UPLOAD_FOLDER']) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.startswith('.'):
+                result = entry.stat()
+                yield BlobInfo(entry.name, result.st_size, result.st_mtime)
+
+def migrate_to_shards(batch_size):
+    """Move os blobs da raiz do UPLOAD_FOLDER para o layout em subdiretórios; gera a contagem acumulada a cada lote.
+
+    Pode rodar com a aplicação no ar: as leituras do LocalBackend procuram nos dois
+    lugares, e cada arquivo é movido com os.replace (atômico). Temporários e arquivos de
+    sessão (nomes iniciados por '.') ficam na raiz.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalBackend):
+        raise RuntimeError('The shard migration only applies to STORAGE_BACKEND=local')
+    moved = 0
+    with os.scandir(storage.root) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            try:
+                move_into_place(entry.path, storage.path(entry.name))
+            except FileNotFoundError:
+                continue  # Removido (ou movido) por outro processo durante a varredura
+            moved += 1
+            if moved % batch_size == 0:
+                yield moved
+    if moved % batch_size or not moved:
+        yield moved
+
+def blob_filename(checksum, extention):
+    """Gera o nome do blob a partir do hash do conteúdo (armazenamento endereçado por conteúdo)."""
+    return secure_filename(f"{checksum}.{extention}")
+
+def blob_etag(filename):
+    """Retorna o ETag forte do blob: o próprio hash do conteúdo, quando o nome é endereçado por conteúdo."""
+    digest = filename.split('.')[0]
+    if CONTENT_DIGEST.fullmatch(digest):
+        return digest
+    return None
+
+def blob_ref_count(filename):
+    """Conta quantos produtos referenciam o blob."""
+    return Product.query.filter_by(file_zip_path=filename).count()
+
+def committed_ref_count(filename):
+    """Conta as referências ao blob numa conexão nova, que enxerga os commits feitos
+    depois do início da transação atual da sessão."""
+    with db.engine.connect() as connection:
+        return connection.execute(
+            select(func.count()).select_from(Product).where(Product.file_zip_path == filename)
+        ).scalar()
+
+def release_blob(filename):
+    """Remove o blob do armazenamento quando nenhum produto o referencia mais.
+
+    Deve ser chamada depois do commit que removeu (ou trocou) a referência; as linhas
+    do manifesto (zip_entries) são removidas na transação atual. Retorna True se o
+    blob estava livre para ser removido.
+
+    Os blobs são compartilhados entre produtos com o mesmo conteúdo, e um upload
+    confirmado entre a contagem e a remoção contaria com o blob existente. Por isso o
+    blob vai para a lápide antes de uma segunda contagem: um upload confirmado depois
+    dela não encontra o blob e o grava de novo; um confirmado antes dela aparece na
+    contagem, e o blob volta da lápide.
+    """
+    if not filename:
+        return False
+    if filename.startswith('.'):
+        if blob_ref_count(filename) > 0:
+            return False
+        # Temporários e arquivos de sessão órfãos (reconcile) ficam sempre no disco local
+        staging_path = upload_path(filename)
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+        return True
+
+    storage = get_storage()
+    if blob_ref_count(filename) > 0:
+        # Uma tentativa anterior pode ter parado com o blob ainda referenciado na lápide
+        storage.restore(filename)
+        return False
+    if storage.hide(filename):
+        if committed_ref_count(filename) > 0:
+            storage.restore(filename)
+            return False
+        storage.purge(filename)
+    # O manifesto do ZIP sai junto com o blob (no commit de quem chama)
+    ZipEntry.query.filter_by(blob=filename).delete(synchronize_session=False)
+    return True
@@ -0,0 +1,150 @@
+# Importações padrão do Python
+import hashlib
+import os
+import tempfile
+
+# Importações do Flask
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+# Tamanho dos blocos lidos/gravados nos uploads
+CHUNK_SIZE = 64 * 1024
+
+# Assinaturas aceitas no início de um ZIP: cabeçalho local (ZIP com entradas) ou fim do diretório central (ZIP vazio)
+ZIP_MAGICS = (b'PK\x03\x04', b'PK\x05\x06')
+# Mensagem dos arquivos recusados pela assinatura (415)
+NOT_A_ZIP = 'Invalid file. Only ZIP archives are accepted'
+
+
+def move_into_place(temp_path, final_path):
+    """Move o temporário para o destino de forma atômica; se o destino já existe (mesmo conteúdo), descarta o temporário."""
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+    else:
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(temp_path, final_path)
+
+def file_checksum(path):
+    """Calcula o SHA-256 (hex) de um arquivo lendo-o em blocos."""
+    hashed = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(CHUNK_SIZE), b''):
+            hashed.update(chunk)
+    return hashed.hexdigest()
+
+class ZipMagicCheck:
+    """Confere a assinatura de ZIP nos primeiros bytes recebidos.
+
+    A verificação acontece no primeiro bloco, antes de o resto do corpo ser lido.
+    """
+
+    def __init__(self):
+        self.head = b''
+        self.done = False
+        self.valid = True
+
+    def feed(self, data):
+        """Recebe o próximo bloco; retorna False se a assinatura não é de um ZIP."""
+        if not self.done:
+            self.head += data[:4 - len(self.head)]
+            if len(self.head) >= 4:
+                self.done = True
+                self.valid = self.head in ZIP_MAGICS
+        return self.valid
+
+def write_chunk(path, offset, stream, max_size=None):
+    """Grava o conteúdo de stream em path a partir de offset, em blocos, e retorna o novo offset.
+
+    Qualquer byte após offset (restos de uma parte interrompida) é descartado antes da escrita.
+    Uma parte que começa no offset 0 precisa começar com a assinatura de ZIP.
+    """
+    magic = ZipMagicCheck() if offset == 0 else None
+    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as fp:
+        fp.seek(offset)
+        fp.truncate()
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            if magic is not None and not magic.feed(chunk):
+                raise UnsupportedMediaType(NOT_A_ZIP)
+            offset += len(chunk)
+            if max_size is not None and offset > max_size:
+                raise RequestEntityTooLarge()
+            fp.write(chunk)
+        fp.flush()
+        os.fsync(fp.fileno())
+    return offset
+
+
+class StreamingUpload:
+    """Arquivo temporário no UPLOAD_FOLDER que calcula tamanho e checksum enquanto os bytes chegam.
+
+    Um arquivo que não começa com a assinatura de ZIP fica marcado como invalid e o resto
+    dos seus bytes é descartado; o multipart segue, e a rota recusa só esse arquivo.
+    """
+
+    def __init__(self, folder):
+        fd, self.temp_path = tempfile.mkstemp(prefix='.upload-', suffix='.part', dir=folder)
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._magic = ZipMagicCheck()
+        self.folder = folder
+        self.size = 0
+        self.committed = False
+        self.invalid = False
+
+    @property
+    def checksum(self):
+        """Retorna o SHA-256 (hex) dos bytes recebidos até agora."""
+        return self._hash.hexdigest()
+
+    def write(self, data):
+        if self.invalid or not self._magic.feed(data):
+            self.invalid = True
+            return len(data)
+        self.size += len(data)
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        # read, seek, tell, readline... são delegados ao arquivo temporário
+        return getattr(self._file, name)
+
+    def commit(self, storage, key):
+        """Grava o arquivo temporário no armazenamento como o blob key (veja backends.StorageBackend.put_file).
+
+        Se o blob já existe (mesmo conteúdo já armazenado), o temporário é só descartado.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        storage.put_file(key, self.temp_path)
+        self.committed = True
+        return key
+
+    def discard(self):
+        """Descarta o arquivo temporário se ele não foi confirmado."""
+        if not self._file.closed:
+            self._file.close()
+        if not self.committed and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def close(self):
+        self.discard()
+
+
+class UploadRequest(Request):
+    """Request que grava os arquivos do multipart direto no UPLOAD_FOLDER, em blocos, sem spool em memória."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.uploads = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload = StreamingUpload(current_app.config['UPLOAD_FOLDER'])
+        self.uploads.append(upload)
+        return upload
+
+    def close(self):
+        # Remove os temporários que não foram confirmados (erro, 413, cliente desconectado...)
+        for upload in self.uploads:
+            upload.discard()
+        super().close()
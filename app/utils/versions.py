@@ -0,0 +1,53 @@
+# Importações padrão do Python
+import datetime
+import itertools
+
+# Importações do Flask e extensões
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Importações do seu projeto
+from app import db
+from app.models.models import Product, TableVersion
+
+# Modelos com contador de escritas em table_versions (a linha é criada pela migração 7)
+VERSIONED_MODELS = (Product,)
+
+
+def bump_versions(connection, tables):
+    """Incrementa a versão das tabelas na transação atual de connection."""
+    table = TableVersion.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.name.in_(sorted(tables)))
+        .values(version=table.c.version + 1, updated_at=datetime.datetime.now())
+    )
+
+def bump_after_flush(session, flush_context):
+    # Em after_flush, new, dirty e deleted ainda mostram o que acabou de ser gravado
+    changed = itertools.chain(
+        session.new,
+        session.deleted,
+        (obj for obj in session.dirty if session.is_modified(obj, include_collections=False)),
+    )
+    tables = {obj.__tablename__ for obj in changed if isinstance(obj, VERSIONED_MODELS)}
+    if tables:
+        bump_versions(session.connection(), tables)
+
+def bump_on_bulk(orm_execute_state):
+    # INSERT/UPDATE/DELETE em massa (Query.delete, session.execute(insert(...))) não passam pelo flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, VERSIONED_MODELS):
+        bump_versions(orm_execute_state.session.connection(), {mapper.local_table.name})
+
+def init_versions():
+    """Liga aos eventos do SQLAlchemy a contagem de escritas (uma vez por processo)."""
+    for name, listener in (('after_flush', bump_after_flush), ('do_orm_execute', bump_on_bulk)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+
+def table_version(name):
+    """Retorna (version, updated_at) da tabela, ou None se ela ainda não tem contador."""
+    return db.session.query(TableVersion.version, TableVersion.updated_at).filter_by(name=name).one_or_none()
@@ -0,0 +1,171 @@
+# Importações padrão do Python
+import os
+import struct
+import zipfile
+
+# Importações do Flask e extensões
+from flask import current_app
+from sqlalchemy import insert
+
+# Importações do seu projeto
+from app import db
+from app.models.models import ZipEntry
+from app.utils.storage import get_storage
+from app.utils.zipstream import LOCAL_HEADER
+
+# Registro de fim do diretório central (EOCD) e, para ZIP64, o localizador e o registro estendido
+EOCD = struct.Struct('<4sHHHHIIH')
+EOCD_SIGNATURE = b'PK\x05\x06'
+ZIP64_LOCATOR = struct.Struct('<4sIQI')
+ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+ZIP64_EOCD = struct.Struct('<4sQHHIIQQQQ')
+ZIP64_EOCD_SIGNATURE = b'PK\x06\x06'
+# Abaixo deste tamanho descompactado a taxa de compressão não é verificada
+RATIO_MIN_SIZE = 1024 * 1024
+
+
+class InvalidZip(ValueError):
+    """Arquivo que não é um ZIP válido ou que excede os limites de descompressão."""
+
+
+def read_eocd(fp, file_size):
+    """Lê o EOCD (e o registro ZIP64, se houver) e retorna (entradas, tamanho e offset do diretório central).
+
+    Lê no máximo os últimos 64 KB do arquivo (EOCD + comentário), nada além disso.
+    """
+    tail_size = min(file_size, EOCD.size + 0xFFFF)
+    fp.seek(file_size - tail_size)
+    tail = fp.read(tail_size)
+    position = tail.rfind(EOCD_SIGNATURE)
+    if position < 0 or tail_size - position < EOCD.size:
+        raise InvalidZip('End of central directory not found')
+    _, disk, cd_disk, _, entries, cd_size, cd_offset, _ = EOCD.unpack_from(tail, position)
+    if disk or cd_disk:
+        raise InvalidZip('Multi-disk archives are not supported')
+    eocd_offset = file_size - tail_size + position
+
+    if entries == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        if eocd_offset < ZIP64_LOCATOR.size:
+            raise InvalidZip('ZIP64 end of central directory not found')
+        fp.seek(eocd_offset - ZIP64_LOCATOR.size)
+        signature, _, zip64_offset, _ = ZIP64_LOCATOR.unpack(fp.read(ZIP64_LOCATOR.size))
+        if signature == ZIP64_LOCATOR_SIGNATURE:
+            fp.seek(zip64_offset)
+            record = fp.read(ZIP64_EOCD.size)
+            if len(record) != ZIP64_EOCD.size or record[:4] != ZIP64_EOCD_SIGNATURE:
+                raise InvalidZip('ZIP64 end of central directory not found')
+            entries, cd_size, cd_offset = ZIP64_EOCD.unpack(record)[7:]
+
+    if cd_offset + cd_size > eocd_offset:
+        raise InvalidZip('Central directory is out of bounds')
+    return entries, cd_size, cd_offset
+
+def read_manifest(fp):
+    """Lê o diretório central do ZIP (seek até o fim do arquivo, sem descompactar nada).
+
+    Lança InvalidZip se o arquivo não é um ZIP válido.
+    """
+    try:
+        with zipfile.ZipFile(fp) as archive:
+            infos = archive.infolist()
+    except (zipfile.BadZipFile, OSError) as e:
+        raise InvalidZip(str(e)) from e
+    return [
+        {
+            'position': position,
+            'name': info.filename,
+            'file_size': info.file_size,
+            'compress_size': info.compress_size,
+            'crc': info.CRC,
+            'compress_type': info.compress_type,
+            'header_offset': info.header_offset,
+        }
+        for position, info in enumerate(infos)
+    ]
+
+def inspect_zip(fp, file_size):
+    """Valida o ZIP (arquivo aberto, com seek) sem descompactar nenhuma entrada e retorna o manifesto. Lança InvalidZip.
+
+    Verifica, nesta ordem: o EOCD; a quantidade de entradas (antes de ler o diretório
+    central) contra ZIP_MAX_ENTRIES; a soma dos tamanhos descompactados contra
+    ZIP_MAX_UNCOMPRESSED e ZIP_MAX_RATIO; e se cada entrada cabe no arquivo sem se
+    sobrepor às outras (bombas com entradas sobrepostas).
+    """
+    config = current_app.config
+    entries, _, cd_offset = read_eocd(fp, file_size)
+    if entries > config['ZIP_MAX_ENTRIES']:
+        raise InvalidZip(f"Too many entries ({entries}, max {config['ZIP_MAX_ENTRIES']})")
+
+    manifest = read_manifest(fp)
+    if len(manifest) != entries:
+        raise InvalidZip('Central directory does not match the end record')
+
+    uncompressed = sum(entry['file_size'] for entry in manifest)
+    if uncompressed > config['ZIP_MAX_UNCOMPRESSED']:
+        raise InvalidZip(f"Uncompressed size too large ({uncompressed} bytes)")
+    if uncompressed > RATIO_MIN_SIZE and uncompressed > config['ZIP_MAX_RATIO'] * file_size:
+        raise InvalidZip(f"Compression ratio too high ({uncompressed // max(file_size, 1)}:1)")
+
+    end = 0
+    for entry in sorted(manifest, key=lambda entry: entry['header_offset']):
+        if entry['header_offset'] < end:
+            raise InvalidZip('Overlapping entries')
+        end = entry['header_offset'] + LOCAL_HEADER.size + entry['compress_size']
+        if end > cd_offset:
+            raise InvalidZip('Entry is out of bounds')
+    return manifest
+
+def is_indexed(blob):
+    return db.session.query(ZipEntry.id).filter_by(blob=blob).first() is not None
+
+def index_blob(blob, fp, file_size):
+    """Valida o ZIP aberto em fp e grava o manifesto do blob na transação atual (o commit fica com quem chama).
+
+    Blobs já indexados (mesmo conteúdo enviado e validado antes) não são lidos de novo.
+    Retorna a quantidade de entradas gravadas; lança InvalidZip se o arquivo for recusado.
+    """
+    if is_indexed(blob):
+        return 0
+    entries = inspect_zip(fp, file_size)
+    if entries:
+        db.session.execute(insert(ZipEntry), [dict(entry, blob=blob) for entry in entries])
+    return len(entries)
+
+def ensure_indexed(blob):
+    """Garante o manifesto do blob; blobs gravados antes do índice são lidos uma vez e confirmados.
+
+    Retorna False se o arquivo não existe ou não é um ZIP válido.
+    """
+    if is_indexed(blob):
+        return True
+    storage = get_storage()
+    info = storage.stat(blob)
+    if info is None:
+        return False
+    try:
+        with storage.open(blob) as fp:
+            index_blob(blob, fp, info.size)
+    except InvalidZip:
+        return False
+    db.session.commit()
+    return True
+
+def index_upload(blob, upload):
+    """Indexa um StreamingUpload ainda no arquivo temporário, antes do commit."""
+    upload.flush()
+    return index_path(blob, upload.temp_path)
+
+def index_path(blob, path):
+    """Indexa um arquivo local (temporário do upload ou arquivo de sessão), antes de gravá-lo no armazenamento."""
+    with open(path, 'rb') as fp:
+        return index_blob(blob, fp, os.fstat(fp.fileno()).st_size)
+
+def entry_to_dict(entry):
+    return {
+        'name': entry.name,
+        'is_dir': entry.name.endswith('/'),
+        'file_size': entry.file_size,
+        'compress_size': entry.compress_size,
+        'crc': f'{entry.crc:08x}',
+        'compress_type': entry.compress_type,
+    }
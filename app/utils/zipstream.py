@@ -0,0 +1,82 @@
+# Importações padrão do Python
+import struct
+import zipfile
+import zlib
+
+# Importações do seu projeto
+from app.utils.upload import CHUNK_SIZE
+
+# Cabeçalho local de uma entrada do ZIP (APPNOTE 4.3.7): 30 bytes + nome + campo extra
+LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+LOCAL_SIGNATURE = b'PK\x03\x04'
+FLAG_ENCRYPTED = 0x1
+
+
+def entry_data_offset(storage, blob, header_offset):
+    """Lê o cabeçalho local da entrada e retorna o offset dos dados compactados no blob."""
+    header = storage.read_range(blob, header_offset, header_offset + LOCAL_HEADER.size)
+    if len(header) != LOCAL_HEADER.size or header[:4] != LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile('Bad local file header')
+    _, _, flags, _, _, _, _, _, _, name_length, extra_length = LOCAL_HEADER.unpack(header)
+    if flags & FLAG_ENCRYPTED:
+        raise NotImplementedError('Encrypted entries are not supported')
+    return header_offset + LOCAL_HEADER.size + name_length + extra_length
+
+def read_stored(chunks, length):
+    """Repassa os blocos de um trecho do blob conferindo se ele tem length bytes (entradas sem compressão)."""
+    remaining = length
+    for chunk in chunks:
+        remaining -= len(chunk)
+        yield chunk
+    if remaining > 0:
+        raise zipfile.BadZipFile('Truncated entry')
+
+def read_deflated(chunks, entry):
+    """Descompacta a entrada (deflate) em blocos de até CHUNK_SIZE, conferindo tamanho e CRC-32 no fim."""
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    crc = 0
+    size = 0
+    for chunk in read_stored(chunks, entry.compress_size):
+        data = chunk
+        while data:
+            # max_length limita a memória mesmo com taxas de compressão altas
+            out = decompressor.decompress(data, CHUNK_SIZE)
+            data = decompressor.unconsumed_tail
+            size += len(out)
+            if size > entry.file_size:
+                raise zipfile.BadZipFile('Entry is larger than declared')
+            crc = zlib.crc32(out, crc)
+            if out:
+                yield out
+    out = decompressor.flush()
+    size += len(out)
+    crc = zlib.crc32(out, crc)
+    if out:
+        yield out
+    if size != entry.file_size or crc != entry.crc:
+        raise zipfile.BadZipFile(f'Bad CRC-32 or size for entry {entry.name}')
+
+def read_member(storage, blob, name):
+    """Outros métodos de compressão (bzip2, lzma...): leitura em blocos pelo zipfile."""
+    with storage.open(blob) as fp, zipfile.ZipFile(fp) as archive, archive.open(name) as member:
+        while True:
+            chunk = member.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def open_entry(storage, blob, entry, byte_range=None):
+    """Gerador com o conteúdo de uma entrada do ZIP, sem extrair para o disco nem carregar tudo em memória.
+
+    entry é a linha do manifesto (zip_entries). Entradas sem compressão são lidas direto
+    do trecho do blob (um único range-get) e aceitam byte_range (start, stop); as com
+    deflate são descompactadas aos poucos. O cabeçalho local é validado e o trecho é
+    aberto antes de devolver o gerador.
+    """
+    start = entry_data_offset(storage, blob, entry.header_offset)
+    if entry.compress_type == zipfile.ZIP_STORED:
+        first, stop = byte_range or (0, entry.file_size)
+        return read_stored(storage.get_stream(blob, start + first, start + stop), stop - first)
+    if entry.compress_type == zipfile.ZIP_DEFLATED:
+        return read_deflated(storage.get_stream(blob, start, start + entry.compress_size), entry)
+    return read_member(storage, blob, entry.name)
@@ -0,0 +1,68 @@
+import argparse
+import datetime
+import time
+import uuid
+
+from app import create_app
+from app.routes.product import product_to_dict
+from app.models.models import Product
+
+def make_products(count):
+    now = datetime.datetime.now()
+    return [
+        Product(
+            id=str(uuid.uuid4()),
+            name=f'Produto {i}',
+            description='Descrição do produto com acentuação',
+            file_zip_path=f'{uuid.uuid4().hex * 2}.zip',
+            id_user=str(uuid.uuid4()),
+            created_at=now + datetime.timedelta(microseconds=i),
+            updated_at=now + datetime.timedelta(microseconds=i),
+        )
+        for i in range(count)
+    ]
+
+def legacy_to_dict(product):
+    # Formato anterior: isoformat() por data em cada linha
+    data = product_to_dict(product)
+    data['created_at'] = product.created_at.isoformat()
+    data['updated_at'] = product.updated_at.isoformat()
+    return data
+
+def bench(app, products, to_dict, repeat):
+    """Menor tempo (ms) para montar e serializar a resposta de /product/list/ com as linhas informadas."""
+    best = None
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            json_response = {
+                "data": [to_dict(product) for product in products],
+                "message": "Products found",
+                "status": 200
+            }
+            app.json.response(json_response).get_data()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara o tempo de serialização JSON das listagens com cada provider')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], help='Quantidade de linhas por cenário')
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções por cenário (vale a mais rápida)')
+    args = parser.parse_args()
+
+    apps = {'stdlib': create_app({'JSON_PROVIDER': 'stdlib', 'SWAGGER_MODE': 'off'})}
+    try:
+        apps['orjson'] = create_app({'JSON_PROVIDER': 'orjson', 'SWAGGER_MODE': 'off'})
+    except RuntimeError:
+        print('orjson não instalado; comparando somente a biblioteca padrão')
+
+    print(f"{'linhas':>8}  {'stdlib+isoformat':>16}  " + '  '.join(f'{name:>10}' for name in apps))
+    for count in args.rows:
+        products = make_products(count)
+        legacy = bench(apps['stdlib'], products, legacy_to_dict, args.repeat)
+        results = [bench(app, products, product_to_dict, args.repeat) for app in apps.values()]
+        print(f'{count:>8}  {legacy:>14.1f}ms  ' + '  '.join(f'{ms:>8.1f}ms' for ms in results))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import datetime
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert
+
+from app import create_app, db
+from app.models.models import Product, User
+from app.models.migrations import migrate
+from app.utils.search import match_query, search_products
+
+def make_vocabulary(size, rng):
+    syllables = ['ca', 'ne', 'la', 'zu', 'ro', 'mi', 'ta', 'po', 'se', 'vi', 'lu', 'ga', 'fe', 'do', 'ri', 'bo']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def insert_products(count, vocabulary, rng, batch_size=10000):
+    """Insere count produtos com textos sorteados (distribuição de Zipf: poucas palavras muito frequentes)."""
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    user = User(name='Bench', last_name='Search', email=f'{uuid.uuid4().hex}@bench.local', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    now = datetime.datetime.now()
+    for first in range(0, count, batch_size):
+        rows = []
+        for i in range(first, min(first + batch_size, count)):
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'name': ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=3)).title(),
+                'description': ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=20)),
+                'file_zip_path': f'{uuid.uuid4().hex * 2}.zip',
+                'id_user': user.id,
+                'created_at': now + datetime.timedelta(microseconds=i),
+                'updated_at': now + datetime.timedelta(microseconds=i),
+            })
+        db.session.execute(insert(Product), rows)
+        db.session.commit()
+
+def timed(query, limit, window, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search_products(query, None, limit, window)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o tempo de /product/search/ (FTS5) numa base SQLite temporária')
+    parser.add_argument('--rows', type=int, default=1000000, help='Quantidade de produtos gerados')
+    parser.add_argument('--limit', type=int, default=20, help='Tamanho da página')
+    parser.add_argument('--repeat', type=int, default=20, help='Execuções por consulta (vale a mediana)')
+    parser.add_argument('--window', type=int, nargs='+', default=[2000, 0], help='Valores de SEARCH_RANK_WINDOW comparados (0: ranqueia tudo)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(20000, rng)
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app({
+            'SWAGGER_MODE': 'off',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(folder, 'bench.db')}",
+            'UPLOAD_FOLDER': os.path.join(folder, 'uploads'),
+        })
+        with app.app_context():
+            db.create_all()
+            migrate()
+            start = time.perf_counter()
+            insert_products(args.rows, vocabulary, rng)
+            print(f'{args.rows} produtos inseridos (com os triggers do índice) em {time.perf_counter() - start:.1f}s')
+
+            queries = {
+                'termo raro': vocabulary[-1],
+                'termo médio': vocabulary[500],
+                'termo frequente': vocabulary[0],
+                'dois termos': f'{vocabulary[10]} {vocabulary[200]}',
+                'prefixo': f'{vocabulary[300][:4]}*',
+            }
+            for label, text in queries.items():
+                query = match_query(text)
+                hits = db.session.execute(db.text('SELECT count(*) FROM products_fts WHERE products_fts MATCH :q'), {'q': query}).scalar()
+                times = '  '.join(f'janela {window}: {timed(query, args.limit, window, args.repeat):8.2f}ms' for window in args.window)
+                print(f'{label:>16}  {text!r:>24}  {hits:>8} resultados  {times}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import argparse
+import json
+
+from app import create_app
+from app.config.swagger import SPEC_ENDPOINT
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera o arquivo JSON da especificação OpenAPI (servido em /apispec_1.json)')
+    parser.add_argument('--output', help='Caminho do arquivo gerado (padrão: SWAGGER_SPEC_FILE ou apispec_1.json)')
+    args = parser.parse_args()
+
+    app = create_app({'SWAGGER_MODE': 'eager'})
+    output = args.output or app.config['SWAGGER_SPEC_FILE'] or f'{SPEC_ENDPOINT}.json'
+    with app.test_request_context():  # O Flasgger precisa de um contexto de requisição
+        spec = app.extensions['apispec'].generate()
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(spec, f, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    print(f"Especificação gerada em {output} ({len(spec['paths'])} rotas)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Dependências pesadas ou opcionais que não podem ser importadas no boot: o flasgger só
+# no primeiro acesso a /apidocs/ (SWAGGER_MODE=lazy), o boto3 só com STORAGE_BACKEND=s3
+# e o orjson só pelo provider de JSON
+DEFERRED_MODULES = ('flasgger', 'boto3', 'botocore', 'orjson')
+
+# Executado num interpretador novo: importa o pacote, cria o app e informa tempos e módulos
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+after_import = [name for name in {modules!r} if name in sys.modules]
+flask_app = app.create_app({config!r})
+created = time.perf_counter()
+after_create = [name for name in {modules!r} if name in sys.modules]
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'after_import': after_import,
+    'after_create': after_create,
+}}))
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(f'FALHOU: {message}')
+        return 1
+    print(f'ok  {message}')
+    return 0
+
+def slowest_imports(count):
+    """Roda python -X importtime -c "import app" e retorna os count módulos com maior tempo acumulado (ms)."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+def measure(config):
+    """Importa o pacote e cria o app num subprocesso; retorna o dict de tempos e módulos."""
+    code = CHILD.format(modules=DEFERRED_MODULES, config=config)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica o tempo de import do pacote app e de create_app() e que as dependências adiadas não são importadas no boot')
+    parser.add_argument('--import-budget-ms', type=float, default=1000, help='Tempo máximo (mediana) de "import app"')
+    parser.add_argument('--create-budget-ms', type=float, default=500, help='Tempo máximo (mediana) de create_app() com SWAGGER_MODE=lazy')
+    parser.add_argument('--repeat', type=int, default=5, help='Subprocessos medidos (vale a mediana)')
+    parser.add_argument('--top', type=int, default=10, help='Módulos mais lentos mostrados (python -X importtime)')
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        # JSON_PROVIDER=stdlib: com 'auto' o orjson é carregado de propósito quando instalado
+        config = {
+            'SWAGGER_MODE': 'lazy',
+            'JSON_PROVIDER': 'stdlib',
+            'STORAGE_BACKEND': 'local',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(folder, 'import.db')}",
+            'UPLOAD_FOLDER': os.path.join(folder, 'uploads'),
+        }
+        measure(config)  # Aquece o cache de bytecode (__pycache__) antes das medições
+        samples = [measure(config) for _ in range(args.repeat)]
+
+    import_ms = statistics.median(sample['import_ms'] for sample in samples)
+    create_ms = statistics.median(sample['create_ms'] for sample in samples)
+    after_import = sorted({name for sample in samples for name in sample['after_import']})
+    after_create = sorted({name for sample in samples for name in sample['after_create']})
+
+    failures += check(not after_import, f"import app não importa {', '.join(DEFERRED_MODULES)}" + (f' (importou {", ".join(after_import)})' if after_import else ''))
+    failures += check(not after_create, f"create_app(SWAGGER_MODE=lazy) não importa {', '.join(DEFERRED_MODULES)}" + (f' (importou {", ".join(after_create)})' if after_create else ''))
+    failures += check(import_ms <= args.import_budget_ms, f'import app em {import_ms:.0f}ms (limite {args.import_budget_ms:.0f}ms)')
+    failures += check(create_ms <= args.create_budget_ms, f'create_app() em {create_ms:.0f}ms (limite {args.create_budget_ms:.0f}ms)')
+
+    print('Módulos mais lentos em "import app" (python -X importtime, acumulado):')
+    for cumulative, name in slowest_imports(args.top):
+        print(f'  {cumulative:8.1f}ms  {name}')
+    if failures:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
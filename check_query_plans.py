@@ -0,0 +1,141 @@
+import argparse
+import datetime
+import itertools
+import os
+import tempfile
+import uuid
+
+from sqlalchemy import insert, text
+
+from app import create_app, db
+from app.models.models import Product, User
+from app.models.migrations import migrate
+from app.routes.product import PRODUCT_FIELDS, PRODUCT_SORT_KEYS
+from app.utils.filters import apply_listing, listing_args
+from app.utils.pagination import encode_cursor, keyset_select
+from app.utils.projection import projection
+
+# Combinações de parâmetros testadas (cada grupo contribui com no máximo um item)
+OWNERS = [{}, {'id_user': 'OWNER'}]
+SORTS = [{}] + [{'sort': f'{sign}{key}'} for key in PRODUCT_SORT_KEYS for sign in ('', '-')]
+FILTERS = [
+    {},
+    {'name': 'Prod'},
+    {'created_after': '2024-01-01'},
+    {'created_before': '2024-02-01T00:00:00'},
+    {'created_after': '2024-01-01', 'created_before': '2024-02-01'},
+    {'updated_after': '2024-01-01T00:00:00+00:00'},
+    {'updated_after': '2024-01-01', 'updated_before': '2024-02-01'},
+    {'name': 'Prod', 'created_after': '2024-01-01'},
+    {'created_after': '2024-01-01', 'updated_before': '2024-02-01'},
+]
+CURSORS = [False, True]
+
+def populate(users, products_per_user):
+    owners = []
+    for i in range(users):
+        user = User(name='Plan', last_name=str(i), email=f'{uuid.uuid4().hex}@plan.local', password_hash='x')
+        db.session.add(user)
+        owners.append(user)
+    db.session.flush()
+    start = datetime.datetime(2023, 6, 1)
+    rows = [{
+        'id': str(uuid.uuid4()),
+        'name': f'Produto {i:06d}',
+        'description': 'd',
+        'file_zip_path': f'{i:064x}.zip',
+        'id_user': owners[i % users].id,
+        'created_at': start + datetime.timedelta(minutes=i),
+        'updated_at': start + datetime.timedelta(minutes=2 * i),
+    } for i in range(users * products_per_user)]
+    db.session.execute(insert(Product), rows)
+    db.session.commit()
+    return owners[0].id
+
+def listing_statement(app, args, owner_id, with_cursor):
+    """Monta o SELECT da página como /product/list/ faria com os parâmetros args e a listagem lida
+    deles (None e a mensagem se a combinação é recusada)."""
+    query = {key: (owner_id if value == 'OWNER' else value) for key, value in args.items()}
+    with app.test_request_context('/product/list/', query_string=query):
+        try:
+            listing = listing_args(PRODUCT_SORT_KEYS, owner_param='id_user')
+        except ValueError as e:
+            return None, None, str(e)
+    fields = list(PRODUCT_FIELDS)
+    stmt = apply_listing(projection(Product, fields, listing.sort_key), Product, listing)
+    cursor = None
+    if with_cursor:
+        value = 'Produto 000100' if listing.sort_key == 'name' else datetime.datetime(2024, 1, 15)
+        cursor = encode_cursor(value, str(uuid.uuid4()))
+    return keyset_select(stmt, Product, cursor, 100, listing.sort_key, listing.descending), listing, None
+
+def query_plan(stmt):
+    sql = str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    return [row.detail for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+def check_plan(listing, with_cursor, plan):
+    """Sem varredura completa da tabela; com filtro, dono ou cursor, busca (SEARCH) num índice da
+    coluna de ordenação ou de uma coluna filtrada, com os demais intervalos como filtro residual.
+    A ordenação em árvore temporária só é aceita quando o índice usado não é o da coluna de
+    ordenação (ordena apenas as linhas do intervalo buscado)."""
+    problems = []
+    prefix = 'ix_products_id_user_' if listing.owner else 'ix_products_'
+    allowed = {f'{prefix}{key}_id': key for key in [listing.sort_key] + [key for key, _, _ in listing.ranges]}
+    searched = [key for detail in plan if detail.startswith('SEARCH')
+                for index, key in allowed.items() if f'INDEX {index} ' in detail]
+    for detail in plan:
+        if detail.startswith('SCAN') and 'INDEX' not in detail:
+            problems.append(f'full table scan: {detail}')
+        if 'TEMP B-TREE' in detail and (not searched or listing.sort_key in searched):
+            problems.append(f'sort without index: {detail}')
+    if (with_cursor or listing.owner or listing.ranges) and not searched:
+        problems.append(f'filtered query does not search any of {", ".join(allowed)}')
+    return problems
+
+def run(app, owner_id, label):
+    failures = checked = rejected = 0
+    for owner, sort, filters, with_cursor in itertools.product(OWNERS, SORTS, FILTERS, CURSORS):
+        args = {**owner, **sort, **filters}
+        stmt, listing, error = listing_statement(app, args, owner_id, with_cursor)
+        if stmt is None:
+            rejected += 1
+            continue
+        checked += 1
+        plan = query_plan(stmt)
+        problems = check_plan(listing, with_cursor, plan)
+        if problems:
+            failures += 1
+            print(f'FALHOU [{label}] {args} cursor={with_cursor}: {"; ".join(problems)}')
+            for detail in plan:
+                print(f'    {detail}')
+    print(f'[{label}] {checked} combinações verificadas, {rejected} recusadas (400), {failures} com problema')
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica com EXPLAIN QUERY PLAN que as combinações de filtros e ordenação das listagens de produtos usam índices')
+    parser.add_argument('--users', type=int, default=20, help='Usuários gerados')
+    parser.add_argument('--products', type=int, default=500, help='Produtos gerados por usuário')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app({
+            'SWAGGER_MODE': 'off',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(folder, 'plans.db')}",
+            'UPLOAD_FOLDER': os.path.join(folder, 'uploads'),
+        })
+        with app.app_context():
+            db.create_all()
+            migrate()
+            owner_id = populate(args.users, args.products)
+            failures = run(app, owner_id, 'sem estatísticas')
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+            # As estatísticas só são lidas por conexões novas
+            db.session.remove()
+            db.engine.dispose()
+            failures += run(app, owner_id, 'após ANALYZE')
+    if failures:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
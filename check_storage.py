@@ -0,0 +1,93 @@
+import argparse
+import io
+import os
+import tempfile
+import zipfile
+
+from app.utils.backends import LocalBackend, S3Backend
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f'FALHOU: {message}')
+    print(f'ok  {message}')
+
+def make_zip(size):
+    """ZIP com uma entrada sem compressão de size bytes (conteúdo pseudoaleatório)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        archive.writestr('data.bin', os.urandom(size))
+    return buffer.getvalue()
+
+def check_backend(backend, key, data):
+    """Contrato da interface StorageBackend: put-stream, get-stream, range-get, stat, open, listagem, lápide e delete."""
+    backend.delete(key)
+    check(backend.stat(key) is None, f'{key}: stat de blob inexistente é None')
+
+    backend.put_stream(key, io.BytesIO(data))
+    info = backend.stat(key)
+    check(info is not None and info.size == len(data), f'{key}: put_stream grava {len(data)} bytes')
+    check(b''.join(backend.get_stream(key)) == data, f'{key}: get_stream devolve o conteúdo inteiro')
+
+    start, stop = len(data) // 3, len(data) // 3 + 1000
+    check(b''.join(backend.get_stream(key, start, stop)) == data[start:stop], f'{key}: get_stream com intervalo')
+    check(backend.read_range(key, start, stop) == data[start:stop], f'{key}: read_range')
+
+    with backend.open(key) as fp, zipfile.ZipFile(fp) as archive:
+        check(archive.read('data.bin') == zipfile.ZipFile(io.BytesIO(data)).read('data.bin'), f'{key}: open + zipfile')
+
+    check(key in {blob.name for blob in backend.iter_blobs()}, f'{key}: iter_blobs lista o blob')
+
+    with tempfile.NamedTemporaryFile(delete=False) as temp:
+        temp.write(data)
+    backend.put_file(key, temp.name)
+    check(not os.path.exists(temp.name), f'{key}: put_file de blob existente só descarta o temporário')
+
+    check(backend.hide(key) and backend.stat(key) is None, f'{key}: hide move o blob para a lápide')
+    check(key not in {blob.name for blob in backend.iter_blobs()}, f'{key}: iter_blobs não lista a lápide')
+    backend.restore(key)
+    check(backend.stat(key) is not None and backend.read_range(key, start, stop) == data[start:stop], f'{key}: restore devolve o blob')
+    backend.hide(key)
+    backend.purge(key)
+    check(not backend.hide(key) and backend.stat(key) is None, f'{key}: purge remove a lápide')
+    backend.put_stream(key, io.BytesIO(data))
+
+    backend.delete(key)
+    check(backend.stat(key) is None, f'{key}: delete remove o blob')
+    try:
+        backend.get_stream(key)
+    except FileNotFoundError:
+        check(True, f'{key}: get_stream de blob removido lança FileNotFoundError')
+    else:
+        check(False, f'{key}: get_stream de blob removido lança FileNotFoundError')
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica os backends de armazenamento (local e, opcionalmente, S3 ou compatível)')
+    parser.add_argument('--size', type=int, default=20 * 1024 * 1024, help='Tamanho do blob grande em bytes (multipart no S3)')
+    parser.add_argument('--endpoint-url', help='Endpoint S3 de teste, ex. http://127.0.0.1:5001 (moto_server, MinIO...)')
+    parser.add_argument('--bucket', default='miniboxdrop-check', help='Bucket de teste (criado se não existir)')
+    parser.add_argument('--part-size', type=int, default=5 * 1024 * 1024, help='Tamanho das partes do multipart')
+    parser.add_argument('--workers', type=int, default=4, help='Partes enviadas em paralelo')
+    args = parser.parse_args()
+
+    small = make_zip(64 * 1024)
+    large = make_zip(args.size)
+
+    with tempfile.TemporaryDirectory() as root:
+        local = LocalBackend(root)
+        check_backend(local, 'small.zip', small)
+        check_backend(local, f"{'ab' * 32}.zip", large)
+
+    if args.endpoint_url:
+        s3 = S3Backend(args.bucket, prefix='check/', endpoint_url=args.endpoint_url,
+                       part_size=args.part_size, workers=args.workers)
+        existing = {bucket['Name'] for bucket in s3.client.list_buckets()['Buckets']}
+        if args.bucket not in existing:
+            s3.client.create_bucket(Bucket=args.bucket)
+        check_backend(s3, 'small.zip', small)
+        check_backend(s3, f"{'ab' * 32}.zip", large)
+        uploads = s3.client.list_multipart_uploads(Bucket=args.bucket).get('Uploads', [])
+        check(not uploads, 'nenhum multipart upload pendente no bucket')
+
+if __name__ == '__main__':
+    main()
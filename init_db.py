@@ -1,9 +1,12 @@
-from app import app, db
+from app import create_app, db
 from app.models.models import *  # Importa os modelos para garantir que eles estão disponíveis
+from app.models.migrations import migrate
 
 def init_db():
-    with app.app_context():  # Utiliza o contexto do aplicativo Flask existente
+    app = create_app({'SWAGGER_MODE': 'off'})
+    with app.app_context():
         db.create_all()  # Cria todas as tabelas no banco de dados
+        migrate()  # Registra (ou aplica) as migrações versionadas
 
 if __name__ == '__main__':
     init_db()
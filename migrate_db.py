@@ -0,0 +1,28 @@
+import argparse
+
+from app import create_app
+from app.models.migrations import MIGRATIONS, applied_versions, migrate
+
+def main():
+    parser = argparse.ArgumentParser(description='Aplica as migrações versionadas do banco de dados')
+    parser.add_argument('--status', action='store_true', help='Mostra as migrações aplicadas e pendentes')
+    parser.add_argument('--target', type=int, help='Aplica as migrações somente até esta versão')
+    args = parser.parse_args()
+
+    app = create_app({'SWAGGER_MODE': 'off'})
+    with app.app_context():
+        if args.status:
+            applied = applied_versions()
+            for version, description, _ in MIGRATIONS:
+                state = 'aplicada' if version in applied else 'pendente'
+                print(f"{version:04d} [{state}] {description}")
+            return
+
+        done = migrate(args.target)
+        if done:
+            print(f"Migrações aplicadas: {', '.join(str(version) for version in done)}")
+        else:
+            print("Banco de dados já está atualizado")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import argparse
+
+from app import create_app
+from app.utils.search import rebuild_search_index, search_available
+
+def main():
+    parser = argparse.ArgumentParser(description='Refaz o índice de busca textual dos produtos (products_fts) a partir da tabela products')
+    parser.parse_args()
+
+    app = create_app({'SWAGGER_MODE': 'off'})
+    with app.app_context():
+        if not search_available():
+            print("A busca textual requer SQLite (FTS5)")
+            return
+        rebuild_search_index()
+        print("Índice de busca refeito")
+
+if __name__ == '__main__':
+    main()
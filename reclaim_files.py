@@ -0,0 +1,18 @@
+import argparse
+
+from app import create_app
+from app.utils.reclaimer import drain, reconcile
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove do UPLOAD_FOLDER os arquivos que não são mais referenciados')
+    parser.add_argument('--reconcile', action='store_true', help='Procura arquivos órfãos no UPLOAD_FOLDER e os enfileira antes de processar a fila')
+    args = parser.parse_args()
+
+    app = create_app({'SWAGGER_MODE': 'off'})
+    with app.app_context():
+        if args.reconcile:
+            print(f"Arquivos órfãos enfileirados: {reconcile()}")
+        print(f"Arquivos processados da fila: {drain()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import argparse
+import time
+
+from app import create_app
+from app.utils.storage import migrate_to_shards
+
+def main():
+    parser = argparse.ArgumentParser(description='Move os arquivos do UPLOAD_FOLDER para o layout em subdiretórios (ab/cd/arquivo), com a aplicação no ar')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Arquivos movidos por lote')
+    parser.add_argument('--pause', type=float, default=0, help='Pausa em segundos entre os lotes (limita o I/O)')
+    args = parser.parse_args()
+
+    app = create_app({'SWAGGER_MODE': 'off'})
+    with app.app_context():
+        moved = 0
+        for moved in migrate_to_shards(args.batch_size):
+            print(f"Arquivos movidos: {moved}")
+            time.sleep(args.pause)
+        print(f"Migração concluída: {moved} arquivos movidos")
+
+if __name__ == '__main__':
+    main()